@@ -142,37 +142,37 @@ def process_v20_signals(signals_df_local):
     if df_to_process.empty:
         return pd.DataFrame()
 
-    results = []
-    for _, row in df_to_process.iterrows():
-        symbol = str(row.get("Symbol", "")).upper()
-        buy_target = row.get("Buy_Price_Low")
-        cmp_val = row.get("Latest Close Price")
-
-        if not symbol or pd.isna(buy_target) or buy_target == 0 or pd.isna(cmp_val):
-            continue
-
-        prox_pct = ((cmp_val - buy_target) / buy_target) * 100
-        buy_date = row.get("Buy_Date")
-        buy_date_str = pd.to_datetime(buy_date).strftime("%Y-%m-%d") if pd.notna(buy_date) else "N/A"
-
-        sell_price = row.get("Sell_Price_High", np.nan)
-        results.append(
-            {
-                "Symbol": symbol,
-                "Signal Buy Date": buy_date_str,
-                "Target Buy Price (Low)": round(buy_target, 2),
-                "Latest Close Price": round(cmp_val, 2),
-                "Proximity to Buy (%)": round(prox_pct, 2),
-                "Closeness (%)": round(abs(prox_pct), 2),
-                "Potential Gain (%)": round(row.get("Sequence_Gain_Percent", np.nan), 2),
-                "Target Sell Price": round(sell_price, 2) if not pd.isna(sell_price) else np.nan,
-            }
-        )
-
-    if not results:
+    # Column arithmetic over the whole frame; rows without a usable buy target are dropped
+    def column(name):
+        if name in df_to_process.columns:
+            return df_to_process[name]
+        return pd.Series(np.nan, index=df_to_process.index)
+
+    symbols = df_to_process["Symbol"].astype(str).str.upper()
+    buy_target = pd.to_numeric(column("Buy_Price_Low"), errors="coerce")
+    cmp_val = pd.to_numeric(df_to_process["Latest Close Price"], errors="coerce")
+    valid = (symbols != "") & buy_target.notna() & (buy_target != 0) & cmp_val.notna()
+    if not valid.any():
         return pd.DataFrame()
 
-    return pd.DataFrame(results).sort_values(by=["Closeness (%)", "Symbol"]).reset_index(drop=True)
+    symbols, buy_target, cmp_val = symbols[valid], buy_target[valid], cmp_val[valid]
+    prox_pct = (cmp_val - buy_target) / buy_target * 100
+    buy_dates = pd.to_datetime(column("Buy_Date")[valid], format="mixed")
+
+    results = pd.DataFrame(
+        {
+            "Symbol": symbols,
+            "Signal Buy Date": buy_dates.dt.strftime("%Y-%m-%d").fillna("N/A"),
+            "Target Buy Price (Low)": buy_target.round(2),
+            "Latest Close Price": cmp_val.round(2),
+            "Proximity to Buy (%)": prox_pct.round(2),
+            "Closeness (%)": prox_pct.abs().round(2),
+            "Potential Gain (%)": pd.to_numeric(column("Sequence_Gain_Percent")[valid], errors="coerce").round(2),
+            "Target Sell Price": pd.to_numeric(column("Sell_Price_High")[valid], errors="coerce").round(2),
+        }
+    ).reset_index(drop=True)
+
+    return results.sort_values(by=["Closeness (%)", "Symbol"]).reset_index(drop=True)
 
 
 def _extract_date_from_name(filename, pattern):
@@ -55,11 +55,10 @@ def test_single_stock_detailed(symbol):
             
             # Check quarterly trend
             if len(quarterly_income) >= 4:
-                last_12 = quarterly_income.head(min(12, len(quarterly_income)))
-                values = [abs(x)/10000000 for x in last_12]
+                values = quarterly_income.head(12).abs().dropna() / 1e7
                 print(f"   Last 12 quarters (Cr): {[f'{v:.2f}' for v in values]}")
-                print(f"   Max in 12 quarters: ₹{max(values):.2f} Cr")
-                print(f"   Latest is highest: {values[0] >= max(values) * 0.95}")
+                print(f"   Max in 12 quarters: ₹{values.max():.2f} Cr")
+                print(f"   Latest is highest: {not values.empty and values.iloc[0] >= values.max() * 0.95}")
         else:
             print("   ⚠ Net Income not found in quarterly financials")
     else:
@@ -169,9 +168,9 @@ def analyze_screening_strictness():
             
             # Check highest quarter
             if len(quarterly_income) >= 4:
-                last_12 = quarterly_income.head(min(12, len(quarterly_income)))
-                max_q = max(abs(x) / 10000000 for x in last_12)
-                is_highest = latest_q >= max_q * 0.95
+                last_12 = quarterly_income.head(12).abs().dropna() / 1e7
+                max_q = last_12.max()
+                is_highest = not last_12.empty and latest_q >= max_q * 0.95
                 print(f"  Latest Q: ₹{latest_q:.2f} Cr | Max: ₹{max_q:.2f} Cr | Highest: {is_highest}")
                 
                 if is_highest:
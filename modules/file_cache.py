@@ -0,0 +1,52 @@
+"""
+Small file-backed JSON cache with a per-instance TTL.
+
+Entries live at ``<root>/<key>/<endpoint>.json`` as ``{"timestamp": epoch, "data": ...}``,
+so the screener's per-symbol fundamentals survive across runs and a re-run within the TTL
+skips the network entirely. Reads and writes are best-effort: a missing, stale, corrupt or
+unwritable entry behaves like a cache miss and never raises into the caller.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+
+class FileCache:
+    def __init__(self, root: Optional[str] = None, ttl_seconds: float = 24 * 3600):
+        self.root = str(root) if root is not None else DEFAULT_CACHE_DIR
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str, endpoint: str) -> str:
+        return os.path.join(self.root, str(key), f"{endpoint}.json")
+
+    def get(self, key: str, endpoint: str, ttl_seconds: Optional[float] = None) -> Optional[Any]:
+        """Return the cached payload, or None when absent, unreadable or older than the TTL.
+
+        ``ttl_seconds`` overrides the instance TTL for this read; pass ``float('inf')`` to
+        read a stale entry (e.g. to revalidate it with a conditional request).
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            with open(self._path(key, endpoint), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            if time.time() - float(entry["timestamp"]) < ttl:
+                return entry["data"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def set(self, key: str, endpoint: str, data: Any) -> None:
+        path = self._path(key, endpoint)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"timestamp": time.time(), "data": data}, fh)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing cache entry {key}/{endpoint}: {e}")
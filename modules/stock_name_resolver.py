@@ -1,52 +1,162 @@
 # modules/stock_name_resolver.py
-import yfinance as yf
-from functools import lru_cache
-import requests
+import atexit
+import os
+import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+# Resolved names survive process restarts so a cold dashboard worker does not
+# repeat a yfinance round-trip per symbol. Loaded once at import, written back at exit.
+# Entries are (name_or_None, expires_at); misses are kept briefly so an unresolvable
+# symbol is not re-fetched on every render.
+NAME_TTL_SECONDS = 30 * 24 * 3600
+MISS_TTL_SECONDS = 3600
+NAME_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".name_cache.pkl")
+
+try:
+    with open(NAME_CACHE_PATH, "rb") as fh:
+        _PERSIST = dict(pickle.load(fh))
+except Exception:
+    _PERSIST = {}
+_dirty = False
+
+
+def _save_name_cache():
+    if not _dirty:
+        return
+    try:
+        tmp_path = f"{NAME_CACHE_PATH}.tmp"
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(_PERSIST, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, NAME_CACHE_PATH)
+    except Exception as e:
+        print(f"Error saving stock name cache: {e}")
+
+
+atexit.register(_save_name_cache)
+
+
+def _cached(symbol):
+    """Return the unexpired (name, expires_at) entry for ``symbol``, else None."""
+    entry = _PERSIST.get(symbol)
+    if isinstance(entry, tuple) and time.time() < entry[1]:
+        return entry
+    return None
+
+
+def _remember(symbol, name):
+    global _dirty
+    ttl = NAME_TTL_SECONDS if name else MISS_TTL_SECONDS
+    _PERSIST[symbol] = (name, time.time() + ttl)
+    _dirty = True
+
+
+# Yahoo's symbol-search endpoint returns a few hundred bytes per lookup, versus the full
+# quoteSummary blob behind ``Ticker.info``. One keep-alive session avoids a TLS handshake
+# per symbol.
+YAHOO_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': 'Mozilla/5.0'})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
+def _search_name(symbol):
+    """Look ``symbol`` up via Yahoo search; None when the endpoint has no usable match."""
+    try:
+        response = _SESSION.get(
+            YAHOO_SEARCH_URL,
+            params={'q': symbol, 'quotesCount': 5, 'newsCount': 0},
+            timeout=2,
+        )
+        response.raise_for_status()
+        quotes = response.json().get('quotes') or []
+    except Exception:
+        return None
+
+    wanted = (f"{symbol}.NS", f"{symbol}.BO")
+    for quote in quotes:
+        if quote.get('symbol') not in wanted:
+            continue
+        name = quote.get('longname') or quote.get('shortname')
+        if name and name != symbol:
+            return name
+    return None
+
+
+def _name_from_ticker(ticker, symbol):
+    """Read the long/short name off a yfinance ticker; None when missing or unusable."""
+    try:
+        info = ticker.info
+        name = info.get('longName') or info.get('shortName')
+    except Exception:
+        return None
+    return name if name and name != symbol else None
+
+
+def _lookup(symbol):
+    """Resolve ``symbol`` to a company name, consulting the on-disk cache before the network."""
+    # Same key ``prefetch_names`` stores under, so prefetched entries are hits here
+    symbol = str(symbol).upper().strip()
+    entry = _cached(symbol)
+    if entry is not None:
+        return entry[0] or symbol
+
+    name = None
+    try:
+        name = _search_name(symbol)
+        # Fall back to yfinance: NSE first, then BSE
+        for suffix in (".NS", ".BO"):
+            if name:
+                break
+            name = _name_from_ticker(yf.Ticker(f"{symbol}{suffix}"), symbol)
+    except Exception as e:
+        print(f"Error resolving name for {symbol}: {e}")
+
+    _remember(symbol, name)
+    return name or symbol
+
 
 class StockNameResolver:
     """Resolve stock symbols to full company names with caching"""
-    
-    def __init__(self):
-        self.cache = {}
-        
-    @lru_cache(maxsize=500)
+
     def get_stock_name(self, symbol):
         """Get full company name for a stock symbol"""
+        return _lookup(symbol)
+
+    def prefetch_names(self, symbols, max_workers=16):
+        """Resolve many symbols up front so later ``get_stock_name`` calls are cache hits.
+
+        Builds one ``yf.Tickers`` object for every uncached symbol and reads each
+        ``.info`` on a small thread pool, overlapping the network round-trips instead
+        of paying them one after another. Symbols missing on NSE fall back to BSE as in
+        ``get_stock_name``; those still unresolved are cached as misses.
+        """
+        pending = [s for s in dict.fromkeys(str(s).upper().strip() for s in symbols) if s and _cached(s) is None]
+        if not pending:
+            return
+
         try:
-            # Check cache first
-            if symbol in self.cache:
-                return self.cache[symbol]
-            
-            # Try yfinance first (faster)
-            try:
-                ticker = yf.Ticker(f"{symbol}.NS")  # NSE format
-                info = ticker.info
-                name = info.get('longName') or info.get('shortName')
-                if name and name != symbol:
-                    self.cache[symbol] = name
-                    return name
-            except:
-                pass
-            
-            # Fallback to BSE format
-            try:
-                ticker = yf.Ticker(f"{symbol}.BO")  # BSE format
-                info = ticker.info
-                name = info.get('longName') or info.get('shortName')
-                if name and name != symbol:
-                    self.cache[symbol] = name
-                    return name
-            except:
-                pass
-            
-            # If all fails, return symbol
-            return symbol
-            
+            tickers = yf.Tickers(" ".join(f"{s}.NS" for s in pending)).tickers
         except Exception as e:
-            print(f"Error resolving name for {symbol}: {e}")
-            return symbol
-    
+            print(f"Error prefetching stock names: {e}")
+            return
+
+        def _resolve(symbol):
+            name = _search_name(symbol)
+            if name:
+                return name
+            ticker = tickers.get(f"{symbol}.NS")
+            name = _name_from_ticker(ticker, symbol) if ticker is not None else None
+            return name or _name_from_ticker(yf.Ticker(f"{symbol}.BO"), symbol)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            for symbol, name in zip(pending, pool.map(_resolve, pending)):
+                _remember(symbol, name)
+
     def get_display_name(self, symbol, max_length=25):
         """Get display name with length limit"""
         full_name = self.get_stock_name(symbol)
@@ -55,4 +165,4 @@ class StockNameResolver:
         return full_name
 
 # Global instance
-stock_resolver = StockNameResolver()
\ No newline at end of file
+stock_resolver = StockNameResolver()
@@ -9,15 +9,19 @@ Based on financial criteria for different sectors
 import pandas as pd
 import yfinance as yf
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import numpy as np
 from datetime import datetime, timedelta
 import sys
 import os
+import threading
 import warnings
 from bs4 import BeautifulSoup
 import re
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from modules.ma_calculator import calculate_moving_averages
+from modules.file_cache import FileCache
 
 # Suppress yfinance warnings
 warnings.filterwarnings('ignore')
@@ -31,12 +35,69 @@ if sys.platform.startswith('win'):
 
 FULL_UNIVERSE_FILENAME = "NSE_EQ_All_Stocks_Analysis.csv"
 
-KNOWN_PSU_SYMBOLS = {
+# Repository root and the report directory, resolved once at import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'output')
+
+# Fundamentals move at most quarterly; a day-old snapshot is fine for screening.
+FUNDAMENTALS_CACHE_TTL = 24 * 3600
+
+# EQUITY_L.csv is re-published at most daily; cached under .cache/_nse/equity_l.json
+NSE_LIST_CACHE_KEY = ('_nse', 'equity_l')
+NSE_LIST_CACHE_TTL = 24 * 3600
+
+# Upper bound on in-flight yfinance + Screener.in fetches during a fresh screen.
+# Keeps the run latency-bound by N / FETCH_CONCURRENCY round-trips instead of N,
+# without opening enough parallel connections to get throttled by Screener.in.
+FETCH_CONCURRENCY = 8
+
+# Minimum spacing of the in-place progress line; the last completion is always shown.
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Shared across fetch workers: Screener.in page loads are spaced by a token bucket
+# rather than a fixed sleep, and a 429 pauses every worker for its Retry-After.
+SCREENER_REQUESTS_PER_SECOND = 4
+SCREENER_MAX_429_RETRIES = 2
+DEFAULT_RETRY_AFTER_SECONDS = 5
+
+# Major NSE stocks used when neither the NSE download nor the committed universe file is
+# available. Sorted and de-duplicated once at import.
+FALLBACK_NSE_SYMBOLS = tuple(sorted({
+    # Nifty 50
+    'RELIANCE', 'TCS', 'HDFCBANK', 'INFY', 'HINDUNILVR', 'ICICIBANK', 'SBIN', 'BHARTIARTL',
+    'ITC', 'KOTAKBANK', 'LT', 'ASIANPAINT', 'AXISBANK', 'MARUTI', 'SUNPHARMA', 'ULTRACEMCO',
+    'TITAN', 'WIPRO', 'NESTLEIND', 'POWERGRID', 'NTPC', 'BAJFINANCE', 'HCLTECH', 'COALINDIA',
+    'ONGC', 'TATASTEEL', 'GRASIM', 'ADANIENT', 'JSWSTEEL', 'INDUSINDBK', 'BAJAJFINSV',
+    'BAJAJ-AUTO', 'CIPLA', 'DRREDDY', 'EICHERMOT', 'GAIL', 'HEROMOTOCO', 'HINDALCO',
+    'HINDPETRO', 'IBULHSGFIN', 'IOC', 'M&M', 'DIVISLAB', 'TECHM', 'TATACONSUM', 'TATAMOTORS',
+    'UPL', 'VEDL', 'APOLLOHOSP', 'BRITANNIA',
+    # Nifty Next 50
+    'BANDHANBNK', 'BERGEPAINT', 'BOSCHLTD', 'BPCL', 'CANBK', 'CHOLAFIN', 'COLPAL', 'DABUR',
+    'DALBHARAT', 'DEEPAKNTR', 'FEDERALBNK', 'GODREJCP', 'HAVELLS', 'HDFCAMC', 'HDFCLIFE',
+    'ICICIPRULI', 'IDFCFIRSTB', 'IGL', 'INDIGO', 'INDUSTOWER', 'JINDALSTEL', 'JUBLFOOD',
+    'LALPATHLAB', 'LUPIN', 'MARICO', 'MCDOWELL-N', 'MFSL', 'MRF', 'MUTHOOTFIN', 'NAUKRI',
+    'NMDC', 'PAGEIND', 'PEL', 'PETRONET', 'PIDILITIND', 'PNB', 'RAMCOCEM', 'RBLBANK',
+    'RECLTD', 'SAIL', 'SHREECEM', 'SIEMENS', 'SRF', 'SRTRANSFIN', 'TORNTPHARM', 'TRENT',
+    'TVSMOTOR', 'UBL', 'VOLTAS', 'ZEEL',
+    # Additional major stocks
+    'ABCAPITAL', 'ABFRL', 'ACC', 'ADANIPORTS', 'ADANIPOWER', 'AJANTPHARM', 'ALKEM', 'AMBUJACEM',
+    'APOLLOTYRE', 'ASHOKLEY', 'ASTRAL', 'AUBANK', 'AUROPHARMA', 'BALKRISIND', 'BALRAMCHIN',
+    'BATAINDIA', 'BEL', 'BHARATFORG', 'BIOCON', 'CANFINHOME', 'CHAMBLFERT', 'COFORGE',
+    'COROMANDEL', 'CROMPTON', 'CUB', 'CUMMINSIND', 'DIXON', 'DLF', 'ESCORTS', 'EXIDEIND',
+    'FORTIS', 'GLENMARK', 'GMRINFRA', 'GODREJPROP', 'GUJGASLTD', 'HAL', 'ICICIGI', 'IDEA',
+    'INDHOTEL', 'IRCTC', 'JKCEMENT', 'JSWENERGY', 'KAJARIACER', 'LTTS', 'MANAPPURAM',
+    'MAXHEALTH', 'MPHASIS', 'NATIONALUM', 'NAVINFLUOR', 'OBEROIRLTY', 'OFSS', 'OIL',
+    'PERSISTENT', 'PFIZER', 'PIIND', 'POLYCAB', 'PRESTIGE', 'PVR', 'SBILIFE', 'SHRIRAMFIN',
+    'SUNTV', 'TATACHEM', 'TATACOMM', 'TATAELXSI', 'TATAPOWER', 'TORNTPOWER', 'TVSMOTOR',
+    'UNIONBANK', 'WHIRLPOOL', 'ZYDUSLIFE'
+}))
+
+KNOWN_PSU_SYMBOLS = frozenset({
     'BHEL', 'BPCL', 'COALINDIA', 'CONCOR', 'GAIL', 'HAL', 'HPCL', 'HUDCO', 'IOC',
     'IRCON', 'IRCTC', 'IRFC', 'IREDA', 'LICI', 'NBCC', 'NLCINDIA', 'NMDC', 'NTPC',
     'OIL', 'ONGC', 'PFC', 'POWERGRID', 'RAILTEL', 'RCF', 'RECLTD', 'SAIL', 'SBI', 'SBIN',
     'SBICARD', 'SBILIFE', 'SCI', 'UNIONBANK'
-}
+})
 
 PSU_NAME_KEYWORDS = (
     'bharat', 'coal india', 'grid corporation', 'government of india', 'indian oil',
@@ -45,8 +106,112 @@ PSU_NAME_KEYWORDS = (
     'state bank of india'
 )
 
+BANK_FINANCE_KEYWORDS = ('bank', 'finance', 'financial', 'insurance', 'mutual fund', 'credit')
+
+# One alternation per keyword set: a single regex scan per string instead of one
+# substring search per keyword. Callers lower-case the text first.
+_BANK_FINANCE_RE = re.compile('|'.join(map(re.escape, BANK_FINANCE_KEYWORDS)))
+_PSU_NAME_RE = re.compile('|'.join(map(re.escape, PSU_NAME_KEYWORDS)))
+
+# Percent signs, thousands separators and whitespace stripped from Screener.in numbers
+_NUMBER_NOISE_RE = re.compile(r'[%,\s]')
+
+NET_INCOME_ROWS = ('Net Income', 'Net Income From Continuing Operation Net Minority Interest', 'Normalized Income')
+
+
+def _net_income_rows(statement):
+    """Yield each Net Income row present in a yfinance statement as a float64 array, newest first."""
+    if not isinstance(statement, pd.DataFrame) or statement.empty:
+        return
+    for row_name in NET_INCOME_ROWS:
+        if row_name in statement.index:
+            yield pd.to_numeric(statement.loc[row_name], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _passes_screening(net_profit, roce, roe, debt_to_equity, public_holding, max_3q, is_bank, is_psu):
+    """
+    The screening rules, element-wise over Series or over NumPy scalars for one record.
+
+    PSUs never pass. Banks/finance need net profit > 1000 Cr, ROE > 10% and public holding
+    < 30%. Everything else needs net profit > 200 Cr and above each of the previous three
+    quarters (``max_3q``, NaN when none are known), ROCE > 20%, ROE >= 15%, D/E <= 1 and
+    public holding < 30%.
+    """
+    bank = (net_profit > 1000) & (roe > 10) & (public_holding < 30)
+    private = (
+        (net_profit > 200)
+        & (roce > 20)
+        & (roe >= 15)
+        & (debt_to_equity <= 1.0)
+        & (public_holding < 30)
+        & (net_profit > max_3q)
+    )
+    return ~is_psu & ((is_bank & bank) | (~is_bank & private))
+
+
+# Report fields of a get_financial_data record, and the report columns built from them
+RECORD_FIELDS = (
+    'symbol', 'company_name', 'sector', 'industry', 'market_cap', 'net_profit', 'roce', 'roe',
+    'debt_to_equity', 'latest_quarter_profit', 'last_3q_profits', 'public_holding',
+    'is_bank_finance', 'is_psu',
+)
+RESULT_COLUMNS = (
+    'Symbol', 'Company Name', 'Sector', 'Industry', 'Market Cap', 'Net Profit (Cr)', 'ROCE (%)',
+    'ROE (%)', 'Debt to Equity', 'Latest Quarter Profit (Cr)', 'Last 3Q Profits (Cr)',
+    'Public Holding (%)', 'Is Bank/Finance', 'Is PSU', 'Passes Criteria', 'Screening Date',
+)
+
+# Explicit dtypes for re-reading a comprehensive CSV: skips per-column type inference, and keeps
+# the text columns as strings even when a chunk of them happens to look numeric
+RESULT_DTYPES = {
+    **dict.fromkeys(('Symbol', 'Company Name', 'Sector', 'Industry', 'Last 3Q Profits (Cr)',
+                     'Screening Date'), 'string'),
+    **dict.fromkeys(('Market Cap', 'Net Profit (Cr)', 'ROCE (%)', 'ROE (%)', 'Debt to Equity',
+                     'Latest Quarter Profit (Cr)', 'Public Holding (%)'), 'float64'),
+}
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; ``acquire`` only sleeps when no token is available."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back for ``seconds`` (e.g. a server's Retry-After)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1.0) - seconds * self.rate
+
+
+def _retry_after_seconds(response):
+    try:
+        return max(0.0, float(response.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
 class StockScreener:
-    def __init__(self):
+    def __init__(self, cache_dir=None):
         self.base_url = "https://www.screener.in/api/company/search/"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -58,73 +223,83 @@ class StockScreener:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # One keep-alive connection per fetch worker, so concurrent Screener.in page loads
+        # reuse sockets instead of overflowing requests' default 10-connection pool.
+        self.session.mount("https://", HTTPAdapter(pool_connections=FETCH_CONCURRENCY, pool_maxsize=FETCH_CONCURRENCY))
+        self.cache = FileCache(cache_dir, ttl_seconds=FUNDAMENTALS_CACHE_TTL)
+        self._screener_limiter = _TokenBucket(SCREENER_REQUESTS_PER_SECOND)
+        # symbol -> Future of the fetch currently in progress, shared by concurrent callers
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._reset_checkpoint()
         
+    def _reset_checkpoint(self):
+        """Start a new append-only checkpoint file on the next periodic save."""
+        self._checkpoint_path = None
+        self._checkpointed = 0  # records already written to _checkpoint_path
+
     def get_nse_stock_list(self):
         """Fetch comprehensive NSE stock list from NSE India website"""
         try:
             print("Fetching all NSE-listed stocks...")
             
-            # Try to fetch from NSE API
+            # The list changes at most daily: serve a fresh cached copy without touching NSE
+            cached = self.cache.get(*NSE_LIST_CACHE_KEY, ttl_seconds=NSE_LIST_CACHE_TTL)
+            if cached and cached.get('symbols'):
+                print(f"Using {len(cached['symbols'])} cached NSE stocks")
+                return list(cached['symbols'])
+
+            # Try to fetch from NSE API, revalidating any stale copy with a conditional GET
             url = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
             headers = {'User-Agent': 'Mozilla/5.0'}
+            stale = self.cache.get(*NSE_LIST_CACHE_KEY, ttl_seconds=float('inf'))
+            if stale and stale.get('symbols'):
+                if stale.get('etag'):
+                    headers['If-None-Match'] = stale['etag']
+                if stale.get('last_modified'):
+                    headers['If-Modified-Since'] = stale['last_modified']
             
+            response = None
             try:
-                response = requests.get(url, headers=headers, timeout=10)
+                # Parse straight off the socket and keep only the SYMBOL column
+                response = requests.get(url, headers=headers, timeout=10, stream=True)
+                if response.status_code == 304 and stale and stale.get('symbols'):
+                    self.cache.set(*NSE_LIST_CACHE_KEY, stale)
+                    print(f"NSE list unchanged; using {len(stale['symbols'])} cached stocks")
+                    return list(stale['symbols'])
                 response.raise_for_status()
-                from io import StringIO
-                df = pd.read_csv(StringIO(response.text))
-                nse_symbols = df['SYMBOL'].tolist()
-                nse_symbols = [s.strip() for s in nse_symbols if isinstance(s, str)]
+                response.raw.decode_content = True
+                df = pd.read_csv(response.raw, usecols=['SYMBOL'], dtype={'SYMBOL': 'string'}, engine='c')
+                nse_symbols = df['SYMBOL'].str.strip().dropna().drop_duplicates().sort_values().tolist()
                 print(f"Fetched {len(nse_symbols)} stocks from NSE")
-                return sorted(list(set(nse_symbols)))
+                self.cache.set(*NSE_LIST_CACHE_KEY, {
+                    'symbols': nse_symbols,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                })
+                return nse_symbols
             except Exception:
                 pass
+            finally:
+                # Streamed: hand the pooled connection back on every path, 304 included
+                if response is not None:
+                    response.close()
 
-            universe_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), FULL_UNIVERSE_FILENAME)
+            universe_path = os.path.join(PROJECT_ROOT, FULL_UNIVERSE_FILENAME)
             if os.path.exists(universe_path):
                 try:
                     universe_df = pd.read_csv(universe_path, usecols=['Symbol'])
-                    nse_symbols = universe_df['Symbol'].dropna().astype(str).str.strip().unique().tolist()
+                    nse_symbols = np.sort(universe_df['Symbol'].dropna().astype(str).str.strip().unique()).tolist()
                     if nse_symbols:
                         print(f"Using {len(nse_symbols)} stocks from committed universe file")
-                        return sorted(nse_symbols)
+                        return nse_symbols
                 except Exception:
                     pass
             
             # Fallback: Comprehensive list of major NSE stocks
             print("Using comprehensive fallback list...")
-            nse_symbols = [
-                # Nifty 50
-                'RELIANCE', 'TCS', 'HDFCBANK', 'INFY', 'HINDUNILVR', 'ICICIBANK', 'SBIN', 'BHARTIARTL',
-                'ITC', 'KOTAKBANK', 'LT', 'ASIANPAINT', 'AXISBANK', 'MARUTI', 'SUNPHARMA', 'ULTRACEMCO',
-                'TITAN', 'WIPRO', 'NESTLEIND', 'POWERGRID', 'NTPC', 'BAJFINANCE', 'HCLTECH', 'COALINDIA',
-                'ONGC', 'TATASTEEL', 'GRASIM', 'ADANIENT', 'JSWSTEEL', 'INDUSINDBK', 'BAJAJFINSV',
-                'BAJAJ-AUTO', 'CIPLA', 'DRREDDY', 'EICHERMOT', 'GAIL', 'HEROMOTOCO', 'HINDALCO',
-                'HINDPETRO', 'IBULHSGFIN', 'IOC', 'M&M', 'DIVISLAB', 'TECHM', 'TATACONSUM', 'TATAMOTORS',
-                'UPL', 'VEDL', 'APOLLOHOSP', 'BRITANNIA',
-                # Nifty Next 50
-                'BANDHANBNK', 'BERGEPAINT', 'BOSCHLTD', 'BPCL', 'CANBK', 'CHOLAFIN', 'COLPAL', 'DABUR',
-                'DALBHARAT', 'DEEPAKNTR', 'FEDERALBNK', 'GODREJCP', 'HAVELLS', 'HDFCAMC', 'HDFCLIFE',
-                'ICICIPRULI', 'IDFCFIRSTB', 'IGL', 'INDIGO', 'INDUSTOWER', 'JINDALSTEL', 'JUBLFOOD',
-                'LALPATHLAB', 'LUPIN', 'MARICO', 'MCDOWELL-N', 'MFSL', 'MRF', 'MUTHOOTFIN', 'NAUKRI',
-                'NMDC', 'PAGEIND', 'PEL', 'PETRONET', 'PIDILITIND', 'PNB', 'RAMCOCEM', 'RBLBANK',
-                'RECLTD', 'SAIL', 'SHREECEM', 'SIEMENS', 'SRF', 'SRTRANSFIN', 'TORNTPHARM', 'TRENT',
-                'TVSMOTOR', 'UBL', 'VOLTAS', 'ZEEL',
-                # Additional major stocks
-                'ABCAPITAL', 'ABFRL', 'ACC', 'ADANIPORTS', 'ADANIPOWER', 'AJANTPHARM', 'ALKEM', 'AMBUJACEM',
-                'APOLLOTYRE', 'ASHOKLEY', 'ASTRAL', 'AUBANK', 'AUROPHARMA', 'BALKRISIND', 'BALRAMCHIN',
-                'BATAINDIA', 'BEL', 'BHARATFORG', 'BIOCON', 'CANFINHOME', 'CHAMBLFERT', 'COFORGE',
-                'COROMANDEL', 'CROMPTON', 'CUB', 'CUMMINSIND', 'DIXON', 'DLF', 'ESCORTS', 'EXIDEIND',
-                'FORTIS', 'GLENMARK', 'GMRINFRA', 'GODREJPROP', 'GUJGASLTD', 'HAL', 'ICICIGI', 'IDEA',
-                'INDHOTEL', 'IRCTC', 'JKCEMENT', 'JSWENERGY', 'KAJARIACER', 'LTTS', 'MANAPPURAM',
-                'MAXHEALTH', 'MPHASIS', 'NATIONALUM', 'NAVINFLUOR', 'OBEROIRLTY', 'OFSS', 'OIL',
-                'PERSISTENT', 'PFIZER', 'PIIND', 'POLYCAB', 'PRESTIGE', 'PVR', 'SBILIFE', 'SHRIRAMFIN',
-                'SUNTV', 'TATACHEM', 'TATACOMM', 'TATAELXSI', 'TATAPOWER', 'TORNTPOWER', 'TVSMOTOR',
-                'UNIONBANK', 'WHIRLPOOL', 'ZYDUSLIFE'
-            ]
-            
-            print(f"Using {len(nse_symbols)} stocks from fallback list")
-            return sorted(list(set(nse_symbols)))
+            print(f"Using {len(FALLBACK_NSE_SYMBOLS)} stocks from fallback list")
+            return list(FALLBACK_NSE_SYMBOLS)
             
         except Exception as e:
             print(f"Error: {e}. Using minimal list.")
@@ -137,12 +312,10 @@ class StockScreener:
         industry_l = str(industry).strip().lower()
         combined = f"{sector_l} {industry_l}"
 
-        is_bank_finance = any(
-            keyword in combined for keyword in ['bank', 'finance', 'financial', 'insurance', 'mutual fund', 'credit']
-        )
+        is_bank_finance = _BANK_FINANCE_RE.search(combined) is not None
         is_psu = (
             symbol_upper in KNOWN_PSU_SYMBOLS
-            or any(keyword in company_name_l for keyword in PSU_NAME_KEYWORDS)
+            or _PSU_NAME_RE.search(company_name_l) is not None
             or ('public sector' in combined)
         )
         return is_bank_finance, is_psu
@@ -151,10 +324,15 @@ class StockScreener:
         """Fetch ROCE, ROE, public holding, and D/E from Screener.in."""
         url = f"https://www.screener.in/company/{symbol}/"
         try:
-            response = self.session.get(url, timeout=15)
+            for _ in range(SCREENER_MAX_429_RETRIES + 1):
+                self._screener_limiter.acquire()
+                response = self.session.get(url, timeout=15)
+                if response.status_code != 429:
+                    break
+                self._screener_limiter.pause(_retry_after_seconds(response))
             if response.status_code != 200:
                 return None
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml')
             roce, roe     = self._parse_key_ratios_ul(soup)
             public_holding = self._parse_shareholding_latest(soup)
             debt_to_equity = self._parse_balance_sheet_de(soup)
@@ -176,7 +354,7 @@ class StockScreener:
           <span class="number">76.7 %</span>
         """
         roce = roe = 0.0
-        for ul in soup.find_all('ul'):
+        for ul in self._key_ratio_candidates(soup):
             text = ul.get_text()
             if 'ROCE' not in text or 'ROE' not in text:
                 continue
@@ -185,7 +363,7 @@ class StockScreener:
                 if len(spans) < 2:
                     continue
                 name = spans[0].get_text(strip=True).rstrip('?').lower().strip()
-                raw  = re.sub(r'[%,\s]', '', spans[-1].get_text(strip=True))
+                raw  = _NUMBER_NOISE_RE.sub('', spans[-1].get_text(strip=True))
                 try:
                     val = float(raw)
                 except ValueError:
@@ -197,6 +375,14 @@ class StockScreener:
             break   # only the first matching ul is the key-ratios bar
         return roce, roe
 
+    @staticmethod
+    def _key_ratio_candidates(soup):
+        """Yield the #top-ratios list first, then every <ul> for pages without that id."""
+        top = soup.find('ul', id='top-ratios')
+        if top is not None:
+            yield top
+        yield from soup.find_all('ul')
+
     def _parse_shareholding_latest(self, soup):
         """
         Return the LATEST quarter's 'Public' holding % from the
@@ -265,6 +451,38 @@ class StockScreener:
         return 0.0
 
     def get_financial_data(self, symbol, max_retries=3):
+        """Get financial data for a stock, served from the on-disk cache while it is fresh"""
+        cached = self.cache.get(symbol, 'fundamentals')
+        if cached is not None:
+            return cached
+
+        # Coalesce: a second caller for a symbol already being fetched waits on that fetch
+        with self._inflight_lock:
+            pending = self._inflight.get(symbol)
+            is_owner = pending is None
+            if is_owner:
+                pending = self._inflight[symbol] = Future()
+        if not is_owner:
+            return pending.result()
+
+        # Only the owner writes the cache; waiters share its record for this run and never store it
+        data = None
+        try:
+            # A fetch that finished between the cache read and taking ownership has cached its result
+            data = self.cache.get(symbol, 'fundamentals')
+            if data is not None:
+                return data
+            data = self._fetch_financial_data(symbol, max_retries=max_retries)
+            # A record without Screener.in ratios would fail the ROCE rule for the whole TTL
+            if data is not None and not data.get('screener_data_missing'):
+                self.cache.set(symbol, 'fundamentals', data)
+            return data
+        finally:
+            with self._inflight_lock:
+                del self._inflight[symbol]
+            pending.set_result(data)
+
+    def _fetch_financial_data(self, symbol, max_retries=3):
         """Get financial data for a stock using yfinance with retry logic"""
         for attempt in range(max_retries + 1):
             try:
@@ -278,12 +496,21 @@ class StockScreener:
                 financials = ticker.financials
                 quarterly_financials = ticker.quarterly_financials
             
+                # Read each info field once
+                company_name = info.get('longName', symbol)
+                sector = info.get('sector', 'Unknown')
+                industry = info.get('industry', 'Unknown')
+                float_shares = info.get('floatShares', 0)
+                shares_outstanding = info.get('sharesOutstanding')
+                roe_yf = info.get('returnOnEquity')
+                yf_de_raw = info.get('debtToEquity')
+
                 # Extract key metrics
                 data = {
                     'symbol': symbol,
-                    'company_name': info.get('longName', symbol),
-                    'sector': info.get('sector', 'Unknown'),
-                    'industry': info.get('industry', 'Unknown'),
+                    'company_name': company_name,
+                    'sector': sector,
+                    'industry': industry,
                     'market_cap': info.get('marketCap', 0),
                     'net_profit': 0,
                     'roce': 0,
@@ -291,45 +518,34 @@ class StockScreener:
                     'debt_to_equity': 0,
                     'latest_quarter_profit': 0,
                     'last_3q_profits': [],
-                    'public_holding': info.get('floatShares', 0) / info.get('sharesOutstanding', 1) * 100 if info.get('sharesOutstanding') else 0,
+                    'public_holding': float_shares / shares_outstanding * 100 if shares_outstanding else 0,
                     'is_bank_finance': False,
-                    'is_psu': False
+                    'is_psu': False,
+                    'screener_data_missing': False,
                 }
                 
                 # Determine if it's a bank/finance company
-                sector = data['sector'].lower()
-                industry = data['industry'].lower()
-                company_name = data['company_name'].lower()
-                
                 data['is_bank_finance'], data['is_psu'] = self.classify_company_flags(
                     symbol=symbol,
-                    company_name=data['company_name'],
-                    sector=data['sector'],
-                    industry=data['industry'],
+                    company_name=company_name,
+                    sector=sector,
+                    industry=industry,
                 )
                 
-                # Get net profit (annual) - try multiple possible row names
-                net_profit_rows = ['Net Income', 'Net Income From Continuing Operation Net Minority Interest', 'Normalized Income']
-                for row_name in net_profit_rows:
-                    if not financials.empty and row_name in financials.index:
-                        net_profit_series = financials.loc[row_name]
-                        if not net_profit_series.empty and not pd.isna(net_profit_series.iloc[0]):
-                            data['net_profit'] = abs(net_profit_series.iloc[0]) / 10000000  # Convert to crores
-                            break
+                # Get net profit (annual) - first Net Income row with a latest value
+                for net_income in _net_income_rows(financials):
+                    if net_income.size and not np.isnan(net_income[0]):
+                        data['net_profit'] = abs(net_income[0]) / 10000000  # Convert to crores
+                        break
                 
                 # Get latest quarter profit and last 3 quarters individual profits
-                quarterly_profit_rows = ['Net Income', 'Net Income From Continuing Operation Net Minority Interest', 'Normalized Income']
                 quarterly_profits = []
-                
-                for row_name in quarterly_profit_rows:
-                    if not quarterly_financials.empty and row_name in quarterly_financials.index:
-                        quarterly_profit_series = quarterly_financials.loc[row_name]
-                        if not quarterly_profit_series.empty:
-                            # Get up to 4 quarters (current + last 3)
-                            for i in range(min(4, len(quarterly_profit_series))):
-                                if not pd.isna(quarterly_profit_series.iloc[i]):
-                                    quarterly_profits.append(abs(quarterly_profit_series.iloc[i]) / 10000000)
-                            break
+                for net_income in _net_income_rows(quarterly_financials):
+                    if net_income.size:
+                        # Up to 4 quarters (current + last 3), in crores, as one array op
+                        recent = np.abs(net_income[:4]) / 10000000
+                        quarterly_profits = recent[~np.isnan(recent)].tolist()
+                        break
                 
                 # Set latest quarter profit and store last 3 quarters as list
                 if quarterly_profits:
@@ -344,12 +560,10 @@ class StockScreener:
                     data['last_3q_profits'] = []
                 
                 # ROE: yfinance as initial value (Screener.in overrides below)
-                roe_yf = info.get('returnOnEquity')
                 data['roe']  = round(roe_yf * 100, 2) if roe_yf is not None else 0.0
                 data['roce'] = 0.0  # Set authoritatively from Screener.in below
 
                 # D/E fallback from yfinance (stored as ratio × 100 in yfinance)
-                yf_de_raw = info.get('debtToEquity')
                 yf_debt_to_equity = round(yf_de_raw / 100, 4) if yf_de_raw else 0.0
 
                 # Screener.in is the authoritative source for ROCE, ROE, public holding, D/E
@@ -365,6 +579,8 @@ class StockScreener:
                     data['debt_to_equity'] = sc_de if sc_de > 0 else yf_debt_to_equity
                 else:
                     data['debt_to_equity'] = yf_debt_to_equity
+                    # Throttled or unreachable: ROCE/ROE/holding are placeholders, not values
+                    data['screener_data_missing'] = True
                 
                 return data
             
@@ -379,25 +595,38 @@ class StockScreener:
         
         return None
     
+    def _get_financial_data_safe(self, symbol):
+        """``get_financial_data`` for the fetch pool: one bad symbol must not abort the batch."""
+        try:
+            return self.get_financial_data(symbol)
+        except Exception as e:
+            print(f"\nError processing {symbol}: {str(e)[:100]}")
+            return None
+
     def check_existing_comprehensive_data(self):
         """Check if there's a recent comprehensive CSV file (within 1 week) with correct format"""
         try:
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
+            output_dir = OUTPUT_DIR
             if not os.path.exists(output_dir):
                 return None
             
-            # Find all comprehensive CSV files
-            csv_files = [f for f in os.listdir(output_dir) if f.startswith('comprehensive_stock_analysis_') and f.endswith('.csv')]
+            # Most recent comprehensive CSV (timestamped names sort chronologically), in one pass
+            with os.scandir(output_dir) as entries:
+                latest = max(
+                    (e for e in entries
+                     if e.name.startswith('comprehensive_stock_analysis_') and e.name.endswith('.csv')),
+                    key=lambda e: e.name,
+                    default=None,
+                )
             
-            if not csv_files:
+            if latest is None:
                 return None
             
-            # Get the most recent file
-            latest_file = sorted(csv_files)[-1]
-            file_path = os.path.join(output_dir, latest_file)
+            latest_file = latest.name
+            file_path = latest.path
             
             # Check file age
-            file_time = os.path.getmtime(file_path)
+            file_time = latest.stat().st_mtime
             current_time = time.time()
             age_days = (current_time - file_time) / (24 * 3600)
             
@@ -424,7 +653,7 @@ class StockScreener:
     def load_existing_comprehensive_data(self, file_path):
         """Load existing comprehensive CSV data"""
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, dtype=RESULT_DTYPES, engine='c')
             print(f"Loaded {len(df)} stocks from existing comprehensive data")
             return df
         except Exception as e:
@@ -432,64 +661,149 @@ class StockScreener:
             return None
     
     def _save_checkpoint(self, all_processed_stocks, processed_count, final=False):
-        """Save checkpoint data"""
+        """Save checkpoint data
+
+        Periodic checkpoints append only the records gathered since the previous save to one
+        checkpoint file per run; the interrupted-run dump is written in full.
+        """
         try:
             if all_processed_stocks:
-                all_df = pd.DataFrame(all_processed_stocks)
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 
                 if final:
-                    filename = f'interrupted_stock_analysis_{timestamp}.csv'
                     print(f"\nSaving interrupted progress...")
-                else:
-                    filename = f'checkpoint_stock_analysis_{processed_count}_{timestamp}.csv'
-                    print(f"\nCheckpoint: Saved progress for {processed_count} stocks")
-                
-                output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
-                os.makedirs(output_dir, exist_ok=True)
-                
-                filepath = os.path.join(output_dir, filename)
-                all_df.to_csv(filepath, index=False)
-                
-                if final:
+                    all_df = self._results_frame(all_processed_stocks)
+                    filepath = self._write_output_csv(all_df, f'interrupted_stock_analysis_{timestamp}.csv')
                     print(f"Progress saved to: {filepath}")
+                    return
+                
+                new_records = all_processed_stocks[self._checkpointed:]
+                if not new_records:
+                    return
+                new_df = self._results_frame(new_records)
+                if self._checkpoint_path is None:
+                    self._checkpoint_path = self._write_output_csv(
+                        new_df, f'checkpoint_stock_analysis_{timestamp}.csv'
+                    )
+                else:
+                    new_df.to_csv(self._checkpoint_path, mode='a', header=False, index=False)
+                self._checkpointed = len(all_processed_stocks)
+                print(f"\nCheckpoint: Saved progress for {processed_count} stocks")
                     
         except Exception as e:
             print(f"Error saving checkpoint: {e}")
     
+    def _write_output_csv(self, df, filename):
+        """Write ``df`` to output/<filename> and return the path."""
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        filepath = os.path.join(OUTPUT_DIR, filename)
+        df.to_csv(filepath, index=False)
+        return filepath
+
     def apply_screening_criteria(self, stock_data):
-        """Apply screening criteria based on sector"""
+        """Apply screening criteria based on sector, with the defaults ``screening_mask`` uses"""
         if not stock_data:
             return False
         
         try:
-            if stock_data.get('is_psu'):
-                return False
-
-            if stock_data['is_bank_finance']:
-                # Bank/Finance: net profit > 1000 Cr, ROE > 10%, public holding < 30%
-                return (stock_data['net_profit'] > 1000 and
-                        stock_data['roe'] > 10 and
-                        stock_data.get('public_holding', 100) < 30)
-            else:
-                # Non-PSU non-financial criteria
-                last_3q = stock_data.get('last_3q_profits', [])
-                profit_exceeds_all_quarters = all(stock_data['net_profit'] > q_profit for q_profit in last_3q) if last_3q else False
-
-                return (stock_data['net_profit'] > 200 and
-                        stock_data['roce'] > 20 and
-                        stock_data.get('roe', 0) >= 15 and
-                        stock_data.get('debt_to_equity', 0) <= 1.0 and
-                        stock_data.get('public_holding', 100) < 30 and
-                        profit_exceeds_all_quarters)
-                       
+            # Defaults stand in for absent keys only; a blank (None/NaN) value fails its rule
+            def num(key, default):
+                if key not in stock_data:
+                    return np.float64(default)
+                value = stock_data[key]
+                return np.float64(np.nan if value is None else pd.to_numeric(value, errors='coerce'))
+
+            def flag(key):
+                value = stock_data.get(key)
+                return np.bool_(False if value is None or pd.isna(value) else value)
+
+            # Highest of the previous three quarters; NaN (never exceeded) when none are known
+            # or when any of them is blank
+            last_3q = stock_data.get('last_3q_profits')
+            quarters = pd.to_numeric(pd.Series(last_3q if isinstance(last_3q, (list, tuple)) else [], dtype=object), errors='coerce')
+            max_3q = np.float64(quarters.max(skipna=False))
+
+            return bool(_passes_screening(
+                num('net_profit', 0), num('roce', 0), num('roe', 0), num('debt_to_equity', 0),
+                num('public_holding', 100), max_3q, flag('is_bank_finance'), flag('is_psu'),
+            ))
         except Exception as e:
             print(f"Error applying criteria: {e}")
             return False
     
-    def screen_stocks(self, checkpoint_interval=50):
+    def screening_mask(self, raw_df):
+        """
+        Column-wise ``apply_screening_criteria`` over a frame of ``get_financial_data``
+        records: one boolean mask per rule instead of one Python call per stock.
+        Missing columns take the same defaults the per-record version uses for missing
+        keys; a blank (NaN) cell fails its rule, as a blank value does per record.
+        """
+        def num(col, default):
+            if col not in raw_df:
+                return pd.Series(default, index=raw_df.index, dtype=float)
+            return pd.to_numeric(raw_df[col], errors='coerce').astype(float)
+
+        def flag(col):
+            if col not in raw_df:
+                return pd.Series(False, index=raw_df.index)
+            return raw_df[col].fillna(False).astype(bool)
+
+        # Highest of the previous three quarters; NaN (never exceeded) when none are known
+        # or when any of a row's own quarters is blank (shorter rows are NaN-padded, not blank)
+        last_3q = raw_df['last_3q_profits'] if 'last_3q_profits' in raw_df else pd.Series([[]] * len(raw_df), index=raw_df.index)
+        last_3q = [list(q) if isinstance(q, (list, tuple)) else [] for q in last_3q]
+        quarters = pd.DataFrame(last_3q, index=raw_df.index, dtype=float)
+        lengths = np.array([len(q) for q in last_3q], dtype=int).reshape(-1, 1)
+        blank = quarters.isna().to_numpy(dtype=bool) & (np.arange(quarters.shape[1]) < lengths)
+        max_3q = quarters.max(axis=1).mask(blank.any(axis=1))
+
+        return _passes_screening(
+            num('net_profit', 0), num('roce', 0), num('roe', 0), num('debt_to_equity', 0),
+            num('public_holding', 100), max_3q, flag('is_bank_finance'), flag('is_psu'),
+        )
+
+    def _results_frame(self, records, screening_date=None):
+        """Stack ``get_financial_data`` records into the report frame, with a vectorized 'Passes Criteria'."""
+        if screening_date is None:
+            screening_date = datetime.now().strftime('%Y-%m-%d')
+        # Fixed field list: no per-record key inference, and a missing field is a NaN column
+        raw_df = pd.DataFrame.from_records(records, columns=RECORD_FIELDS)
+
+        def measure(col, decimals):
+            return pd.to_numeric(raw_df[col], errors='coerce').astype('float64').round(decimals)
+
+        def flag(col):
+            return raw_df[col].fillna(False).astype(bool)
+
+        return pd.DataFrame({
+            'Symbol': raw_df['symbol'],
+            'Company Name': raw_df['company_name'],
+            'Sector': raw_df['sector'],
+            'Industry': raw_df['industry'],
+            'Market Cap': raw_df['market_cap'],
+            'Net Profit (Cr)': measure('net_profit', 2),
+            'ROCE (%)': measure('roce', 2),
+            'ROE (%)': measure('roe', 2),
+            'Debt to Equity': measure('debt_to_equity', 4),
+            'Latest Quarter Profit (Cr)': measure('latest_quarter_profit', 2),
+            'Last 3Q Profits (Cr)': [
+                ', '.join(str(round(q, 2)) for q in qs) if isinstance(qs, (list, tuple)) and qs else 'N/A'
+                for qs in raw_df['last_3q_profits']
+            ],
+            'Public Holding (%)': measure('public_holding', 2),
+            'Is Bank/Finance': flag('is_bank_finance'),
+            'Is PSU': flag('is_psu'),
+            'Passes Criteria': self.screening_mask(raw_df),
+            'Screening Date': screening_date,
+        }, columns=RESULT_COLUMNS)
+
+    def screen_stocks(self, checkpoint_interval=50, max_workers=FETCH_CONCURRENCY):
         """Main screening function with checkpoint system"""
         print("Starting stock screening process...")
+        # One date/timestamp for the whole run: every row and both output files agree
+        run_started = datetime.now()
+        screening_date = run_started.strftime('%Y-%m-%d')
+        run_timestamp = run_started.strftime('%Y%m%d_%H%M%S')
         
         # Check for existing comprehensive data first
         existing_data_path = self.check_existing_comprehensive_data()
@@ -498,46 +812,26 @@ class StockScreener:
             all_df = self.load_existing_comprehensive_data(existing_data_path)
             if all_df is not None:
                 # Re-apply screening criteria to existing data
-                screened_stocks = []
-                for _, row in all_df.iterrows():
-                    stock_data = {
-                        'symbol': row['Symbol'],
-                        'company_name': row['Company Name'],
-                        'sector': row['Sector'],
-                        'industry': row['Industry'],
-                        'market_cap': row['Market Cap'],
-                        'net_profit': row['Net Profit (Cr)'],
-                        'roce': row['ROCE (%)'],
-                        'roe': row['ROE (%)'],
-                        'debt_to_equity': row['Debt to Equity'],
-                        'latest_quarter_profit': row['Latest Quarter Profit (Cr)'],
-                        'last_3q_profits': [float(x.strip()) for x in str(row['Last 3Q Profits (Cr)']).split(',') if x.strip() and x.strip() != 'N/A'] if pd.notna(row['Last 3Q Profits (Cr)']) and str(row['Last 3Q Profits (Cr)']) != 'N/A' else [],
-                        'public_holding': row['Public Holding (%)'],
-                        'is_bank_finance': row['Is Bank/Finance'],
-                        'is_psu': row['Is PSU']
-                    }
-                    
-                    if self.apply_screening_criteria(stock_data):
-                        screened_stocks.append({
-                            'Symbol': stock_data['symbol'],
-                            'Company Name': stock_data['company_name'],
-                            'Sector': stock_data['sector'],
-                            'Industry': stock_data['industry'],
-                            'Market Cap': stock_data['market_cap'],
-                            'Net Profit (Cr)': stock_data['net_profit'],
-                            'ROCE (%)': stock_data['roce'],
-                            'ROE (%)': stock_data['roe'],
-                            'Debt to Equity': stock_data['debt_to_equity'],
-                            'Latest Quarter Profit (Cr)': stock_data['latest_quarter_profit'],
-                            'Last 3Q Profits (Cr)': ', '.join([str(round(q, 2)) for q in stock_data.get('last_3q_profits', [])]) if stock_data.get('last_3q_profits') else 'N/A',
-                            'Public Holding (%)': stock_data['public_holding'],
-                            'Is Bank/Finance': stock_data['is_bank_finance'],
-                            'Is PSU': stock_data['is_psu'],
-                            'Screening Date': datetime.now().strftime('%Y-%m-%d')
-                        })
+                raw_df = all_df.rename(columns={
+                    'Symbol': 'symbol',
+                    'Net Profit (Cr)': 'net_profit',
+                    'ROCE (%)': 'roce',
+                    'ROE (%)': 'roe',
+                    'Debt to Equity': 'debt_to_equity',
+                    'Public Holding (%)': 'public_holding',
+                    'Is Bank/Finance': 'is_bank_finance',
+                    'Is PSU': 'is_psu',
+                })
+                raw_df['last_3q_profits'] = [
+                    [float(x.strip()) for x in str(v).split(',') if x.strip() and x.strip() != 'N/A']
+                    if pd.notna(v) and str(v) != 'N/A' else []
+                    for v in all_df['Last 3Q Profits (Cr)']
+                ]
+                screened_stocks = all_df.loc[self.screening_mask(raw_df)].drop(columns=['Passes Criteria'], errors='ignore')
+                screened_stocks = screened_stocks.assign(**{'Screening Date': screening_date})
                 
                 print(f"Found {len(screened_stocks)} stocks meeting updated criteria from existing data.")
-                return pd.DataFrame(screened_stocks)
+                return screened_stocks.reset_index(drop=True)
         
         # If no existing data or loading failed, proceed with fresh screening
         
@@ -547,120 +841,73 @@ class StockScreener:
             print("Failed to get NSE stock list")
             return pd.DataFrame()
         
-        screened_stocks = []
-        all_processed_stocks = []  # Store ALL stocks with their data
+        all_processed_stocks = []  # Raw get_financial_data records for every stock fetched
+        self._reset_checkpoint()
         total_stocks = len(nse_symbols)
         
         print(f"Screening {total_stocks} stocks...")
         print(f"Progress will be saved every {checkpoint_interval} stocks")
         
-        for i, symbol in enumerate(nse_symbols):
-            try:
-                sys.stdout.write(f"\rProcessing [{i+1}/{total_stocks}] {symbol} ({((i+1)/total_stocks)*100:.1f}%)")
-                sys.stdout.flush()
-                
-                # Get financial data
-                stock_data = self.get_financial_data(symbol)
-                
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {pool.submit(self._get_financial_data_safe, s): s for s in nse_symbols}
+        i, symbol = -1, None
+        next_progress = 0.0
+        try:
+            # Consume in completion order so one slow symbol does not stall progress or checkpoints
+            for i, future in enumerate(as_completed(futures)):
+                symbol = futures[future]
+                stock_data = future.result()
+                now = time.monotonic()
+                if now >= next_progress or i + 1 == total_stocks:
+                    next_progress = now + PROGRESS_INTERVAL_SECONDS
+                    sys.stdout.write(f"\rProcessing [{i+1}/{total_stocks}] {symbol} ({((i+1)/total_stocks)*100:.1f}%)")
+                    sys.stdout.flush()
+
                 if stock_data:
-                    # Add screening result to the data
-                    passes_criteria = self.apply_screening_criteria(stock_data)
-                    
-                    # Store ALL stocks with complete data
-                    all_stock_record = {
-                        'Symbol': stock_data['symbol'],
-                        'Company Name': stock_data['company_name'],
-                        'Sector': stock_data['sector'],
-                        'Industry': stock_data['industry'],
-                        'Market Cap': stock_data['market_cap'],
-                        'Net Profit (Cr)': round(stock_data['net_profit'], 2),
-                        'ROCE (%)': round(stock_data['roce'], 2),
-                        'ROE (%)': round(stock_data['roe'], 2),
-                        'Debt to Equity': round(stock_data['debt_to_equity'], 4),
-                        'Latest Quarter Profit (Cr)': round(stock_data['latest_quarter_profit'], 2),
-                        'Last 3Q Profits (Cr)': ', '.join([str(round(q, 2)) for q in stock_data.get('last_3q_profits', [])]) if stock_data.get('last_3q_profits') else 'N/A',
-                        'Public Holding (%)': round(stock_data['public_holding'], 2),
-                        'Is Bank/Finance': stock_data['is_bank_finance'],
-                        'Is PSU': stock_data['is_psu'],
-                        'Passes Criteria': passes_criteria,
-                        'Screening Date': datetime.now().strftime('%Y-%m-%d')
-                    }
-                    all_processed_stocks.append(all_stock_record)
-                    
-                    # Only add to screened_stocks if it passes criteria
-                    if passes_criteria:
-                        screened_stocks.append({
-                            'Symbol': stock_data['symbol'],
-                            'Company Name': stock_data['company_name'],
-                            'Sector': stock_data['sector'],
-                            'Industry': stock_data['industry'],
-                            'Market Cap': stock_data['market_cap'],
-                            'Net Profit (Cr)': round(stock_data['net_profit'], 2),
-                            'ROCE (%)': round(stock_data['roce'], 2),
-                            'ROE (%)': round(stock_data['roe'], 2),
-                            'Debt to Equity': round(stock_data['debt_to_equity'], 4),
-                            'Latest Quarter Profit (Cr)': round(stock_data['latest_quarter_profit'], 2),
-                            'Last 3Q Profits (Cr)': ', '.join([str(round(q, 2)) for q in stock_data.get('last_3q_profits', [])]) if stock_data.get('last_3q_profits') else 'N/A',
-                            'Public Holding (%)': round(stock_data['public_holding'], 2),
-                            'Is Bank/Finance': stock_data['is_bank_finance'],
-                            'Is PSU': stock_data['is_psu'],
-                            'Screening Date': datetime.now().strftime('%Y-%m-%d')
-                        })
-                
+                    all_processed_stocks.append(stock_data)
+
                 # Save checkpoint every N stocks
                 if (i + 1) % checkpoint_interval == 0 and all_processed_stocks:
                     self._save_checkpoint(all_processed_stocks, i + 1)
-                
-                # Rate limiting to avoid overwhelming Screener.in
-                time.sleep(1.5)  # Increased delay for Screener.in requests
-                
-            except KeyboardInterrupt:
-                print(f"\n\nScript interrupted by user at {symbol}")
-                print(f"Processed {len(all_processed_stocks)} stocks so far")
-                if all_processed_stocks:
-                    self._save_checkpoint(all_processed_stocks, i + 1, final=True)
-                break
-            except Exception as e:
-                print(f"\nError processing {symbol}: {str(e)[:100]}")
-                continue
-        
+        except KeyboardInterrupt:
+            print(f"\n\nScript interrupted by user at {symbol}")
+            print(f"Processed {len(all_processed_stocks)} stocks so far")
+            if all_processed_stocks:
+                self._save_checkpoint(all_processed_stocks, i + 1, final=True)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        # Screening criteria are evaluated once, column-wise, over every fetched stock
+        all_df = self._results_frame(all_processed_stocks, screening_date) if all_processed_stocks else pd.DataFrame()
+        screened_stocks = (
+            all_df.loc[all_df['Passes Criteria']].drop(columns=['Passes Criteria']).reset_index(drop=True)
+            if not all_df.empty else pd.DataFrame()
+        )
+
         print(f"\n\nScreening completed. Found {len(screened_stocks)} stocks meeting criteria.")
         
         # Save ALL processed stocks to comprehensive CSV
         if all_processed_stocks:
-            all_df = pd.DataFrame(all_processed_stocks)
             all_df = all_df.sort_values('Market Cap', ascending=False)
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            comprehensive_filename = f'comprehensive_stock_analysis_{timestamp}.csv'
-            
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
-            os.makedirs(output_dir, exist_ok=True)
+            comprehensive_filename = f'comprehensive_stock_analysis_{run_timestamp}.csv'
             
-            comprehensive_filepath = os.path.join(output_dir, comprehensive_filename)
-            all_df.to_csv(comprehensive_filepath, index=False)
+            comprehensive_filepath = self._write_output_csv(all_df, comprehensive_filename)
             print(f"\nCOMPREHENSIVE DATA saved to: {comprehensive_filepath}")
             print(f"Total stocks analyzed: {len(all_processed_stocks)}")
             print(f"Stocks passing criteria: {len(screened_stocks)}")
             print(f"Success rate: {(len(screened_stocks)/len(all_processed_stocks))*100:.2f}%")
         
-        # Convert to DataFrame for regular processing
-        df = pd.DataFrame(screened_stocks)
+        df = screened_stocks
         
         if not df.empty:
             # Sort by market cap descending
             df = df.sort_values('Market Cap', ascending=False)
             
             # Save to CSV with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'screened_stocks_{timestamp}.csv'
+            filename = f'screened_stocks_{run_timestamp}.csv'
             
-            # Create output directory if it doesn't exist
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
-            df.to_csv(filepath, index=False)
+            filepath = self._write_output_csv(df, filename)
             print(f"Results saved to: {filepath}")
             
             # Display summary
@@ -673,13 +920,18 @@ class StockScreener:
             if 'Sector' in df.columns:
                 print("\nSector breakdown:")
                 sector_counts = df['Sector'].value_counts()
-                for sector, count in sector_counts.items():
-                    print(f"  {sector}: {count}")
+                print("\n".join(f"  {sector}: {count}" for sector, count in zip(sector_counts.index, sector_counts.to_numpy())))
             
             # Show top 10 by market cap
             print("\nTop 10 stocks by Market Cap:")
-            top_10 = df.head(10)[['Symbol', 'Company Name', 'Market Cap', 'Net Profit (Cr)']]
-            print(top_10.to_string(index=False))
+            print(f"{'Symbol':<12} {'Company Name':<30} {'Market Cap':>18} {'Net Profit (Cr)':>15}")
+            top_10 = df.nlargest(10, 'Market Cap')
+            for sym, name, mcap, net_profit in zip(
+                top_10['Symbol'].to_numpy(), top_10['Company Name'].to_numpy(),
+                pd.to_numeric(top_10['Market Cap'], errors='coerce').to_numpy(dtype=float),
+                pd.to_numeric(top_10['Net Profit (Cr)'], errors='coerce').to_numpy(dtype=float),
+            ):
+                print(f"{sym!s:<12} {str(name)[:30]:<30} {mcap:>18,.0f} {net_profit:>15.2f}")
         
         return df
     
@@ -695,17 +947,21 @@ class StockScreener:
             
             # Sector analysis
             print("\nSector breakdown:")
-            sector_counts = df['Sector'].value_counts()
+            # Categorical sectors: one grouped pass instead of a string-compare mask per sector
+            sectors = df['Sector'].astype('category')
+            sector_counts = sectors.value_counts()
+            passed_by_sector = df['Passes Criteria'].astype(bool).groupby(sectors, observed=True).sum()
             for sector, count in sector_counts.head(10).items():
-                passed = df[(df['Sector'] == sector) & (df['Passes Criteria'])].shape[0]
+                passed = int(passed_by_sector.get(sector, 0))
                 print(f"  {sector}: {count} total, {passed} passed ({(passed/count)*100:.1f}%)")
             
             # Top performers
-            passed_stocks = df[df['Passes Criteria']].sort_values('Market Cap', ascending=False)
+            passed_stocks = df[df['Passes Criteria']].nlargest(10, 'Market Cap')
             if not passed_stocks.empty:
                 print(f"\nTop 10 stocks that passed criteria:")
-                for idx, row in passed_stocks.head(10).iterrows():
-                    print(f"  {row['Symbol']} - {row['Company Name']} (Market Cap: {row['Market Cap']:,.0f})")
+                top = passed_stocks[['Symbol', 'Company Name', 'Market Cap']].itertuples(index=False, name=None)
+                for sym, name, mcap in top:
+                    print(f"  {sym} - {name} (Market Cap: {mcap:,.0f})")
             
             return df
             
@@ -721,24 +977,41 @@ class StockScreener:
             print("No stocks found meeting the criteria.")
             return df
         
-        # Limit to max_stocks
-        recommendations = df.head(max_stocks)
+        # Limit to max_stocks; bounded selection, since the cached-data path returns rows unsorted
+        recommendations = df.nlargest(max_stocks, 'Market Cap').reset_index(drop=True)
         
         print(f"\n=== TOP {len(recommendations)} STOCK RECOMMENDATIONS ===")
-        for idx, row in recommendations.iterrows():
-            print(f"\n{idx+1}. {row['Symbol']} - {row['Company Name']}")
-            print(f"   Sector: {row['Sector']}")
-            print(f"   Market Cap: Rs.{row['Market Cap']:,.0f}")
-            print(f"   Net Profit: Rs.{row['Net Profit (Cr)']} Cr")
-            if row['Is Bank/Finance']:
-                print(f"   ROE: {row['ROE (%)']}%")
+        rows = zip(
+            recommendations.index, *(recommendations[c].to_numpy() for c in (
+                'Symbol', 'Company Name', 'Sector', 'Market Cap', 'Net Profit (Cr)',
+                'Is Bank/Finance', 'ROE (%)', 'ROCE (%)', 'Debt to Equity',
+            ))
+        )
+        for idx, sym, name, sector, mcap, net_profit, is_bank, roe, roce, de in rows:
+            print(f"\n{idx+1}. {sym} - {name}")
+            print(f"   Sector: {sector}")
+            print(f"   Market Cap: Rs.{mcap:,.0f}")
+            print(f"   Net Profit: Rs.{net_profit} Cr")
+            if is_bank:
+                print(f"   ROE: {roe}%")
             else:
-                print(f"   ROCE: {row['ROCE (%)']}%")
-                print(f"   Debt/Equity: {row['Debt to Equity']}")
+                print(f"   ROCE: {roce}%")
+                print(f"   Debt/Equity: {de}")
         
         return recommendations
 
 
+def _ticker_frame(batch_data, ticker_symbol, batch_len):
+    """One ticker's OHLC frame from a ``yf.download(group_by='ticker')`` result, or None."""
+    if isinstance(batch_data.columns, pd.MultiIndex):
+        try:
+            return batch_data[ticker_symbol]
+        except KeyError:
+            return None
+    # A single-ticker download may come back without the ticker column level
+    return batch_data if batch_len == 1 else None
+
+
 def add_moving_averages_to_stocks(df):
     """
     Add moving averages to stock dataframe
@@ -746,25 +1019,22 @@ def add_moving_averages_to_stocks(df):
     if df.empty:
         return df
     
-    df_with_ma = df.copy()
     ma_columns = ['MA10', 'MA50', 'MA100', 'MA200']
     
-    # Initialize MA columns
-    for col in ma_columns:
-        df_with_ma[col] = np.nan
-    if 'Current_Price' not in df_with_ma.columns:
-        df_with_ma['Current_Price'] = np.nan
+    # Initialize MA columns (and Current_Price unless the caller already has one) as one NaN block
+    init_columns = ma_columns + ([] if 'Current_Price' in df.columns else ['Current_Price'])
+    ma_block = pd.DataFrame(np.nan, index=df.index, columns=init_columns)
+    df_with_ma = pd.concat([df.drop(columns=ma_columns, errors='ignore'), ma_block], axis=1)
     
-    symbols = df_with_ma['Symbol'].dropna().astype(str).str.upper().str.strip().tolist()
-    symbol_to_indices = {}
-    for idx, symbol in zip(df_with_ma.index, symbols):
-        symbol_to_indices.setdefault(symbol, []).append(idx)
+    # Normalized symbol per row (NA kept in place so it stays aligned with the frame)
+    row_symbols = df_with_ma['Symbol'].astype('string').str.upper().str.strip()
+    unique_symbols = row_symbols.dropna().unique().tolist()
+    ma_by_symbol = {}  # symbol -> {column: value}, written back once per column at the end
 
     batch_size = 100
-    total_batches = max(1, (len(symbol_to_indices) + batch_size - 1) // batch_size)
+    total_batches = max(1, (len(unique_symbols) + batch_size - 1) // batch_size)
     print(f"Calculating moving averages for all stocks in {total_batches} batches...")
 
-    unique_symbols = list(symbol_to_indices.keys())
     for batch_num, start in enumerate(range(0, len(unique_symbols), batch_size), start=1):
         batch_symbols = unique_symbols[start:start + batch_size]
         print(
@@ -793,14 +1063,7 @@ def add_moving_averages_to_stocks(df):
         for symbol in batch_symbols:
             ticker_symbol = f"{symbol}.NS"
             try:
-                price_frame = None
-                if isinstance(batch_data.columns, pd.MultiIndex):
-                    try:
-                        price_frame = batch_data[ticker_symbol]
-                    except KeyError:
-                        price_frame = None
-                elif len(batch_symbols) == 1:
-                    price_frame = batch_data
+                price_frame = _ticker_frame(batch_data, ticker_symbol, len(batch_symbols))
 
                 if price_frame is None or 'Close' not in price_frame.columns:
                     continue
@@ -816,13 +1079,17 @@ def add_moving_averages_to_stocks(df):
                     if len(close_series) >= period:
                         ma_values[f'MA{period}'] = round(close_series.rolling(window=period).mean().iloc[-1], 2)
 
-                for idx in symbol_to_indices.get(symbol, []):
-                    for key, value in ma_values.items():
-                        df_with_ma.loc[idx, key] = value
+                ma_by_symbol[symbol] = ma_values
             except Exception as e:
                 print(f"Error calculating MA for {symbol}: {e}")
                 continue
     
+    if ma_by_symbol:
+        ma_df = pd.DataFrame.from_dict(ma_by_symbol, orient='index')
+        for col in ma_df.columns:
+            # Rows without fresh data keep what they had (e.g. an existing Current_Price)
+            df_with_ma[col] = row_symbols.map(ma_df[col]).astype('float64').fillna(df_with_ma[col])
+    
     return df_with_ma
 
 def add_nse_categories_to_stocks(df):
@@ -835,7 +1102,7 @@ def add_nse_categories_to_stocks(df):
     """
     from modules.nse_category_fetcher import refresh_nifty_membership
 
-    categories_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "nse_categories.csv")
+    categories_path = os.path.join(PROJECT_ROOT, "nse_categories.csv")
     try:
         refreshed = refresh_nifty_membership(categories_path)
         if refreshed:
@@ -858,6 +1125,41 @@ def get_current_market_price(symbol):
     except Exception as e:
         print(f"Error fetching price for {symbol}: {e}")
     return None
+
+def get_current_market_prices(symbols):
+    """
+    Get current market prices for many symbols with one batched yfinance download.
+    Returns {symbol: price}; symbols without recent data are left out.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    ticker_symbols = [f"{symbol}.NS" for symbol in symbols]
+    try:
+        data = yf.download(
+            tickers=ticker_symbols,
+            period="2d",
+            progress=False,
+            group_by="ticker",
+            threads=True,
+        )
+    except Exception as e:
+        print(f"Error fetching prices for {len(symbols)} symbols: {e}")
+        return {}
+    
+    prices = {}
+    if data is None or data.empty:
+        return prices
+    for symbol, ticker_symbol in zip(symbols, ticker_symbols):
+        price_frame = _ticker_frame(data, ticker_symbol, len(symbols))
+        if price_frame is None or 'Close' not in price_frame.columns:
+            continue
+        close = pd.to_numeric(price_frame['Close'], errors='coerce').dropna()
+        if not close.empty:
+            prices[symbol] = close.iloc[-1]
+    return prices
+
+def main():
     """Main function to run the stock screener"""
     screener = StockScreener()
     
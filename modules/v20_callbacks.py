@@ -8,23 +8,60 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
+from statistics import fmean, median, pstdev
 from zoneinfo import ZoneInfo
 from src.indicators import AdvancedIndicatorCalculator, identify_signals
 from modules.notification_engine import get_notification_engine, AlertType, NotificationPriority
 from modules.stock_name_resolver import stock_resolver
 
+# Static signal presentation tables, built once instead of per rendered card.
+# Strength runs 1 (bearish) .. 5 (strongest buy); icons/badges are indexed by it.
+_SIGNAL_STRENGTH = {
+    "STRONG BUY": 5, "BUY NOW": 4, "BUY": 3,
+    "WATCH": 2, "NEUTRAL": 2,
+    "OVERBOUGHT": 1, "WAIT (BEARISH)": 1,
+}
+_STRENGTH_ICONS = ("", "↓", "→", "↑", "↑", "↑")
+_STRENGTH_BADGES = (
+    "", "signal-badge bearish", "signal-badge neutral",
+    "signal-badge bullish", "signal-badge bullish", "signal-badge bullish",
+)
+_SIGNAL_COLORS = {
+    "STRONG BUY": "#10d9aa",
+    "BUY NOW": "#10d9aa",
+    "BUY": "#10d9aa",
+    "WAIT (Bearish)": "#e8a000",
+    "OVERBOUGHT": "#ff5a6e",
+}
+_BUY_SIGNALS = frozenset({"STRONG BUY", "BUY NOW", "BUY"})
+
+# Main V20 table schema: numeric columns sort numerically; hidden ones feed cards/notifications only
+_NUMERIC_TABLE_COLUMNS = frozenset({
+    "Current Price", "Buy Price", "Target Sell Price", "Closeness (%)", "Potential Gain (%)",
+})
+_HIDDEN_TABLE_COLUMNS = frozenset({
+    "Closeness (%)", "RSI", "MACD Signal",
+})
+
+# Last completed-candle RSI/MACD per symbol: {symbol: (IST trading date, rsi, macd)}.
+# Indicators only move when a new daily candle closes, so interval ticks reuse these.
+_EOD_INDICATOR_CACHE = {}
+
+
+@lru_cache(maxsize=8)
+def _table_column_specs(columns: tuple) -> list:
+    """DataTable column specs for the main V20 table; cached per frame schema (do not mutate)."""
+    return [
+        {"name": col, "id": col, "type": "numeric" if col in _NUMERIC_TABLE_COLUMNS else "text"}
+        for col in columns if col not in _HIDDEN_TABLE_COLUMNS
+    ]
+
 def _build_signal_card(row) -> html.Div:
     """Build a mobile signal card from one row of the processed V20 dataframe."""
     signal = str(row.get("Signal Strength", "")).upper()
-    strength_map = {
-        "STRONG BUY": 5, "BUY NOW": 4, "BUY": 3,
-        "WATCH": 2, "NEUTRAL": 2,
-        "OVERBOUGHT": 1, "WAIT (BEARISH)": 1,
-    }
-    strength = strength_map.get(signal, 2)
-    icon = "↑" if strength >= 3 else ("→" if strength == 2 else "↓")
-    is_bullish = strength >= 3
-    is_neutral = strength == 2
+    strength = _SIGNAL_STRENGTH.get(signal, 2)
+    icon = _STRENGTH_ICONS[strength]
 
     proximity = float(row.get("Closeness (%)", 0) or 0)
     ltp = float(row.get("Latest Close Price", 0) or 0)
@@ -32,7 +69,7 @@ def _build_signal_card(row) -> html.Div:
     symbol = str(row.get("Symbol", ""))
 
     meter = "■" * strength + "□" * (5 - strength)
-    badge_class = "signal-badge bullish" if is_bullish else ("signal-badge neutral" if is_neutral else "signal-badge bearish")
+    badge_class = _STRENGTH_BADGES[strength]
 
     return html.Div(
         className="signal-card",
@@ -89,6 +126,7 @@ def register_v20_callbacks(app):
             # Check which button was clicked
             if ctx.triggered and 'refresh-v20-live-data-button' in ctx.triggered[0]['prop_id']:
                 print("V20 REFRESH: Re-processing with new live prices...")
+                _EOD_INDICATOR_CACHE.clear()
                 data_manager.v20_processed_df = data_manager.process_v20_signals(data_manager.v20_signals_df)
             
             # Get processed data
@@ -123,8 +161,9 @@ def register_v20_callbacks(app):
             # Calculate market sentiment
             sentiment_score, sentiment_label, sentiment_color = calculate_market_sentiment(filtered_df)
             
-            # Create enhanced table with indicators FIRST
-            enhanced_df = add_technical_indicators_to_df(filtered_df, indicator_calc)
+            # Create enhanced table with indicators FIRST, on the callback's own copy of the
+            # filtered slice; add_technical_indicators_to_df fills it in place
+            enhanced_df = add_technical_indicators_to_df(filtered_df.copy(), indicator_calc)
             
             # Calculate technical indicators for top stocks using enhanced_df
             indicators_grid = create_indicators_grid(enhanced_df, indicator_calc)
@@ -139,10 +178,7 @@ def register_v20_callbacks(app):
                 id='v20-main-table',
                 data=enhanced_df.to_dict('records'),
                 row_selectable='single',
-                columns=[
-                    {'name': col, 'id': col, 'type': 'numeric' if col in ['Current Price', 'Buy Price', 'Target Sell Price', 'Closeness (%)', 'Potential Gain (%)'] else 'text'}
-                    for col in enhanced_df.columns if col not in ['Closeness (%)', 'RSI', 'MACD Signal', 'Suggested Sell Price', 'Profit Strategy']
-                ],
+                columns=_table_column_specs(tuple(enhanced_df.columns)),
                 page_size=15,
                 sort_action="native",
                 filter_action="native",
@@ -185,24 +221,13 @@ def register_v20_callbacks(app):
                     {'if': {'filter_query': '{Sell Trigger} = "SELL SOON"'}, 'backgroundColor': 'rgba(232,160,0,0.12)', 'color': '#e8a000'},
                 ],
                 fixed_rows={'headers': True},
-                tooltip_data=[
-                    {
-                        'Suggested Sell Price': {
-                            'value': 'Sell Price = Buy Price + 20% | Target 30% gains but hold longer if STRONG HOLD signal appears',
-                            'type': 'markdown'
-                        }
-                    } for _ in range(len(enhanced_df))
-                ],
-                tooltip_duration=None
             )
             
             # Build mobile signal cards — all rows visible, filter chips narrow client-side
             mobile_cards = [_build_signal_card(row) for _, row in enhanced_df.iterrows()]
             # Badge count = actionable buy signals only
             if 'Signal Strength' in enhanced_df.columns:
-                signal_count_val = int(enhanced_df['Signal Strength'].str.upper().isin(
-                    ['STRONG BUY', 'BUY NOW', 'BUY']
-                ).sum())
+                signal_count_val = int(enhanced_df['Signal Strength'].str.upper().isin(_BUY_SIGNALS).sum())
             else:
                 signal_count_val = 0
 
@@ -251,7 +276,7 @@ def register_v20_callbacks(app):
         symbol = str(row.get('Symbol', '')).upper().strip()
         signal_strength = row.get('Signal Strength', '')
 
-        if signal_strength not in ('STRONG BUY', 'BUY NOW', 'BUY'):
+        if signal_strength not in _BUY_SIGNALS:
             return html.Div([
                 html.Div(f'Historical panel only available for BUY signals. '
                          f'{symbol} is currently {signal_strength}.',
@@ -320,18 +345,7 @@ def create_indicators_grid(df, indicator_calc):
             signal_strength = stock.get('Signal Strength', 'N/A')
             
             # Determine signal color based on signal strength
-            if signal_strength == "STRONG BUY":
-                signal_color = "#10d9aa"
-            elif signal_strength == "BUY NOW":
-                signal_color = "#10d9aa"
-            elif signal_strength == "BUY":
-                signal_color = "#10d9aa"
-            elif signal_strength == "WAIT (Bearish)":
-                signal_color = "#e8a000"
-            elif signal_strength == "OVERBOUGHT":
-                signal_color = "#ff5a6e"
-            else:
-                signal_color = "#9090c0"
+            signal_color = _SIGNAL_COLORS.get(signal_strength, "#9090c0")
 
             card = html.Div([
                 html.H6(symbol, style={'margin': '0 0 10px 0', 'color': '#e8a000', 'fontWeight': 'bold'}),
@@ -375,54 +389,111 @@ def create_indicators_grid(df, indicator_calc):
         print(f"Error creating indicators grid: {e}")
         return html.Div("Error loading indicators", style={'color': '#dc3545'})
 
+def _signal_strengths(closeness, rsi, macd):
+    """Vectorized V20 signal strength from closeness-to-buy %, RSI and MACD line arrays (NaN = unknown)."""
+    closeness = np.asarray(closeness, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+    macd = np.asarray(macd, dtype=float)
+    with np.errstate(invalid='ignore'):
+        rsi_known = ~np.isnan(rsi)
+        rsi_bullish = rsi_known & (rsi < 70)
+        rsi_oversold = rsi_known & (rsi < 30)
+        macd_bullish = ~np.isnan(macd) & (macd > 0)
+        at_target = closeness <= 2
+        near_target = closeness <= 5
+        overbought = rsi_known & (rsi > 70)
+    # First matching rule wins, in the same order the per-row rules were written
+    return np.select(
+        [
+            at_target & rsi_oversold & macd_bullish,
+            at_target & rsi_bullish & macd_bullish,
+            near_target & rsi_bullish & macd_bullish,
+            at_target & ~macd_bullish,
+            overbought,
+        ],
+        ["STRONG BUY", "BUY NOW", "BUY", "WAIT (Bearish)", "OVERBOUGHT"],
+        default="WATCH",
+    )
+
+
+def _fetch_eod_histories(symbols):
+    """Daily OHLC for many symbols from one batched yfinance download: {symbol: frame}."""
+    tickers = [f"{symbol}.NS" for symbol in symbols]
+    data = yf.download(
+        tickers=tickers,
+        period="6mo",
+        interval="1d",
+        auto_adjust=False,
+        group_by="ticker",
+        progress=False,
+        threads=True,
+    )
+    histories = {}
+    if data is None or data.empty:
+        return histories
+    for symbol, ticker in zip(symbols, tickers):
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker in data.columns.get_level_values(0):
+                histories[symbol] = data[ticker]
+        elif len(tickers) == 1:
+            histories[symbol] = data
+    return histories
+
+
 def add_technical_indicators_to_df(df, indicator_calc):
-    """Add technical indicator columns to the dataframe"""
+    """Add technical indicator columns to the dataframe (mutates and returns df)"""
     try:
-        enhanced_df = df.copy()
+        enhanced_df = df
         
-        rsi_values = []
-        macd_signals = []
-        signal_strengths = []
+        symbols = df['Symbol'].astype(str).str.upper().str.strip() if 'Symbol' in df.columns else pd.Series('', index=df.index)
+        unique_symbols = [s for s in dict.fromkeys(symbols) if s]
+        
+        # Reuse today's cached values; only symbols without them need history
+        trading_date = datetime.now(ZoneInfo("Asia/Kolkata")).date()
+        indicators = {}
+        for symbol in unique_symbols:
+            cached = _EOD_INDICATOR_CACHE.get(symbol)
+            if cached is not None and cached[0] == trading_date:
+                indicators[symbol] = cached[1:]
+        missing = [s for s in unique_symbols if s not in indicators]
+        
+        # One batched history download for every missing symbol instead of a request per row
+        failed = set()
+        try:
+            histories = _fetch_eod_histories(missing) if missing else {}
+        except Exception as e:
+            print(f"Error calculating indicators: {e}")
+            histories, failed = {}, set(missing)
         
-        for _, row in df.iterrows():
-            symbol = str(row.get('Symbol', '')).upper().strip()
+        for symbol in missing:
+            if symbol in failed:
+                continue
             try:
-                rsi_val, macd_line = calculate_eod_rsi_macd(symbol, indicator_calc)
-                
-                # Determine signal strength based on all technical factors
-                closeness = row.get('Closeness (%)', 100)
-                
-                # Technical conditions
-                rsi_bullish = not np.isnan(rsi_val) and rsi_val < 70
-                macd_bullish = not np.isnan(macd_line) and macd_line > 0
-                rsi_oversold = not np.isnan(rsi_val) and rsi_val < 30
-                
-                if closeness <= 2 and rsi_oversold and macd_bullish:
-                    signal_strength = "STRONG BUY"
-                elif closeness <= 2 and rsi_bullish and macd_bullish:
-                    signal_strength = "BUY NOW"
-                elif closeness <= 5 and rsi_bullish and macd_bullish:
-                    signal_strength = "BUY"
-                elif closeness <= 2 and not macd_bullish:
-                    signal_strength = "WAIT (Bearish)"
-                elif not np.isnan(rsi_val) and rsi_val > 70:
-                    signal_strength = "OVERBOUGHT"
-                else:
-                    signal_strength = "WATCH"
-                
-                rsi_values.append(rsi_val if not np.isnan(rsi_val) else None)
-                macd_signals.append(macd_line if not np.isnan(macd_line) else None)
-                signal_strengths.append(signal_strength)
-                
+                rsi_val, macd_val = _eod_rsi_macd_from_history(histories.get(symbol), indicator_calc)
             except Exception as e:
                 print(f"Error calculating indicators: {e}")
-                rsi_values.append(None)
-                macd_signals.append(None)
-                signal_strengths.append("N/A")
+                failed.add(symbol)
+                continue
+            # Missing from the batch, empty or too short: show N/A and retry on the next tick
+            if not (np.isfinite(rsi_val) and np.isfinite(macd_val)):
+                failed.add(symbol)
+                continue
+            indicators[symbol] = (rsi_val, macd_val)
+            _EOD_INDICATOR_CACHE[symbol] = (trading_date, rsi_val, macd_val)
         
-        enhanced_df['RSI'] = rsi_values
-        enhanced_df['MACD Signal'] = macd_signals
-        enhanced_df['Signal Strength'] = signal_strengths
+        rsi = np.array([indicators.get(s, (np.nan, np.nan))[0] for s in symbols], dtype=float)
+        macd = np.array([indicators.get(s, (np.nan, np.nan))[1] for s in symbols], dtype=float)
+        closeness = (
+            pd.to_numeric(df['Closeness (%)'], errors='coerce').to_numpy(dtype=float)
+            if 'Closeness (%)' in df.columns else np.full(len(df), 100.0)
+        )
+        strengths = _signal_strengths(closeness, rsi, macd)
+        if failed:
+            strengths = np.where(symbols.isin(failed).to_numpy(), "N/A", strengths)
+        
+        enhanced_df['RSI'] = rsi
+        enhanced_df['MACD Signal'] = macd
+        enhanced_df['Signal Strength'] = strengths
         
         return enhanced_df
     
@@ -437,6 +508,11 @@ def calculate_eod_rsi_macd(symbol, indicator_calc):
         return np.nan, np.nan
 
     history = yf.Ticker(f"{symbol}.NS").history(period="6mo", interval="1d", auto_adjust=False)
+    return _eod_rsi_macd_from_history(history, indicator_calc)
+
+
+def _eod_rsi_macd_from_history(history, indicator_calc):
+    """Last RSI and MACD line from a daily OHLC frame, dropping today's still-forming candle."""
     if history is None or history.empty or 'Close' not in history.columns:
         return np.nan, np.nan
 
@@ -463,59 +539,25 @@ def calculate_eod_rsi_macd(symbol, indicator_calc):
         float(macd_line) if not pd.isna(macd_line) else np.nan,
     )
 
-def add_sell_price_guidance(df):
-    """Add sell price suggestions based on market research"""
-    try:
-        enhanced_df = df.copy()
-        
-        # Calculate suggested sell price (20% above buy price)
-        if 'Buy Price' in enhanced_df.columns:
-            enhanced_df['Suggested Sell Price'] = enhanced_df['Buy Price'] * 1.20
-            
-            # Add profit guidance column
-            profit_guidance = []
-            for _, row in enhanced_df.iterrows():
-                signal_strength = row.get('Signal Strength', 'N/A')
-                
-                if signal_strength in ['STRONG BUY', 'BUY NOW']:
-                    guidance = "🎯 Target 30% gains, but hold longer if momentum continues"
-                elif signal_strength == 'BUY':
-                    guidance = "📈 Take 20-25% profits, watch for reversal signals"
-                elif signal_strength == 'OVERBOUGHT':
-                    guidance = "⚠️ Consider selling - stock may be overvalued"
-                else:
-                    guidance = "📊 Monitor technical indicators for exit timing"
-                
-                profit_guidance.append(guidance)
-            
-            enhanced_df['Profit Strategy'] = profit_guidance
-        
-        return enhanced_df
-    
-    except Exception as e:
-        print(f"Error adding sell price guidance: {e}")
-        return df
-
 def add_sell_trigger_to_df(df):
     """Add Sell Trigger column based on proximity to V20 Sell_Price_High target"""
-    sell_triggers = []
-    for _, row in df.iterrows():
-        current = row.get('Latest Close Price')
-        sell_target = row.get('Target Sell Price')
-        if pd.isna(current) or pd.isna(sell_target) or sell_target == 0:
-            sell_triggers.append("N/A")
-            continue
-        proximity = ((current - sell_target) / sell_target) * 100
-        if proximity >= 0:
-            sell_triggers.append("SELL NOW")
-        elif proximity >= -2:
-            sell_triggers.append("SELL SOON")
-        elif proximity >= -5:
-            sell_triggers.append("APPROACHING")
-        else:
-            sell_triggers.append("HOLD")
+    def _column(name):
+        if name not in df.columns:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+
+    current = _column('Latest Close Price')
+    sell_target = _column('Target Sell Price')
+    valid = ~np.isnan(current) & ~np.isnan(sell_target) & (sell_target != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proximity = (current - sell_target) / sell_target * 100
+
     result = df.copy()
-    result['Sell Trigger'] = sell_triggers
+    result['Sell Trigger'] = np.select(
+        [~valid, proximity >= 0, proximity >= -2, proximity >= -5],
+        ["N/A", "SELL NOW", "SELL SOON", "APPROACHING"],
+        default="HOLD",
+    )
     return result
 
 def _fetch_price_history_for_backtesting(symbol):
@@ -675,11 +717,14 @@ def build_stock_history_panel(symbol, current_row, outcomes):
         days_list = [t['holding_days'] for t in completed]
         ann_returns = [min(((1 + g / 100) ** (365 / max(d, 1)) - 1) * 100, 999.0)
                        for g, d in zip(gains, days_list)]
-        avg_gain = round(np.mean(gains), 1)
-        med_gain = round(np.median(gains), 1)
-        avg_days = round(np.mean(days_list), 1)
-        avg_ann = round(np.mean(ann_returns), 0)
-        cv = (np.std(gains) / np.mean(gains) * 100) if len(gains) > 1 and np.mean(gains) > 0 else 100
+        # A symbol has a handful of completed trades; the statistics module works on
+        # the lists directly instead of converting each one to an ndarray first.
+        mean_gain = fmean(gains)
+        avg_gain = round(mean_gain, 1)
+        med_gain = round(median(gains), 1)
+        avg_days = round(fmean(days_list), 1)
+        avg_ann = round(fmean(ann_returns), 0)
+        cv = (pstdev(gains) / mean_gain * 100) if len(gains) > 1 and mean_gain > 0 else 100
         consistency = max(0, min(100, round(100 - cv))) if len(gains) > 1 else None
 
         def stat_card(label, value, sub=None, color='#f0f0f8'):
@@ -811,96 +856,83 @@ def build_stock_history_panel(symbol, current_row, outcomes):
     ])
 
 
+def _v20_alert_card(icon, headline, detail, note, time_str, accent, tint, fill, edge):
+    """Build one V20 notification card; ``tint`` is the "r,g,b" of the card background/border."""
+    lines = [
+        html.Div([
+            html.Span(icon, style={'fontSize': '20px', 'marginRight': '10px'}),
+            html.Span(headline, style={'fontWeight': 'bold', 'color': accent})
+        ]),
+        html.Div(detail, style={'fontSize': '12px', 'color': '#9090c0'}),
+    ]
+    if note:
+        lines.append(html.Div(note, style={'fontSize': '11px', 'color': accent, 'fontStyle': 'italic'}))
+    lines.append(html.Div(time_str, style={'fontSize': '10px', 'color': '#5858a0'}))
+    return html.Div(lines, style={
+        'backgroundColor': f'rgba({tint},{fill})',
+        'border': f'1px solid rgba({tint},{edge})',
+        'borderRadius': '5px',
+        'padding': '10px',
+        'margin': '5px 0',
+        'borderLeft': f'4px solid {accent}'
+    })
+
+
 def generate_v20_notifications(df, notification_engine):
     """Generate notifications for V20 signals"""
     try:
         notifications = []
-        current_time = datetime.now()
+        # Every card in one render shares the same timestamp; format it once
+        time_str = datetime.now().strftime('%H:%M:%S')
         
-        # Check for STRONG BUY signals (best conditions)
-        strong_buy_signals = df[df.get('Signal Strength', '') == 'STRONG BUY'] if 'Signal Strength' in df.columns else pd.DataFrame()
+        # Slice each alert category once from a single snapshot of the strength column,
+        # keeping only the rows that can actually become cards
+        if 'Signal Strength' in df.columns:
+            strength = df['Signal Strength'].to_numpy(dtype=object)
+            strong_buy_signals = df[strength == 'STRONG BUY'].head(2)
+            buy_now_signals = df[strength == 'BUY NOW'].head(3)
+            bearish_signals = df[strength == 'WAIT (Bearish)'].head(2)
+        else:
+            strong_buy_signals = buy_now_signals = bearish_signals = pd.DataFrame()
+
+        # Resolve every name shown below in one batch instead of one lookup per card
+        stock_resolver.prefetch_names(
+            symbol
+            for frame in (strong_buy_signals, buy_now_signals, bearish_signals)
+            if 'Symbol' in frame.columns
+            for symbol in frame['Symbol'].dropna()
+        )
         
-        for _, stock in strong_buy_signals.head(2).iterrows():
-            symbol = stock.get('Symbol', 'Unknown')
-            closeness = stock.get('Closeness (%)', 0)
+        for stock in strong_buy_signals.to_dict('records'):
             buy_price = stock.get('Target Buy Price (Low)', 0)
             sell_price = buy_price * 1.20 if buy_price > 0 else 0
-            full_name = stock_resolver.get_display_name(symbol)
-            
-            notifications.append(
-                html.Div([
-                    html.Div([
-                        html.Span("🚀", style={'fontSize': '20px', 'marginRight': '10px'}),
-                        html.Span(f"STRONG BUY: {full_name}", style={'fontWeight': 'bold', 'color': '#10d9aa'})
-                    ]),
-                    html.Div(f"{closeness:.1f}% from target | Buy: ₹{buy_price:.2f} | Sell: ₹{sell_price:.2f}", style={'fontSize': '12px', 'color': '#9090c0'}),
-                    html.Div("💰 Sell at 20% profit, hold longer if strong momentum continues", style={'fontSize': '11px', 'color': '#10d9aa', 'fontStyle': 'italic'}),
-                    html.Div(current_time.strftime('%H:%M:%S'), style={'fontSize': '10px', 'color': '#5858a0'})
-                ], style={
-                    'backgroundColor': 'rgba(16,217,170,0.08)',
-                    'border': '1px solid rgba(16,217,170,0.25)',
-                    'borderRadius': '5px',
-                    'padding': '10px',
-                    'margin': '5px 0',
-                    'borderLeft': '4px solid #10d9aa'
-                })
-            )
+            notifications.append(_v20_alert_card(
+                "🚀", f"STRONG BUY: {stock_resolver.get_display_name(stock.get('Symbol', 'Unknown'))}",
+                f"{stock.get('Closeness (%)', 0):.1f}% from target | Buy: ₹{buy_price:.2f} | Sell: ₹{sell_price:.2f}",
+                "💰 Sell at 20% profit, hold longer if strong momentum continues",
+                time_str, accent='#10d9aa', tint='16,217,170', fill=0.08, edge=0.25,
+            ))
 
         # Check for BUY NOW signals
-        buy_now_signals = df[df.get('Signal Strength', '') == 'BUY NOW'] if 'Signal Strength' in df.columns else pd.DataFrame()
-
-        for _, stock in buy_now_signals.head(3).iterrows():
-            symbol = stock.get('Symbol', 'Unknown')
-            closeness = stock.get('Closeness (%)', 0)
+        for stock in buy_now_signals.to_dict('records'):
             buy_price = stock.get('Target Buy Price (Low)', 0)
             sell_price = buy_price * 1.30 if buy_price > 0 else 0
-            full_name = stock_resolver.get_display_name(symbol)
-
-            notifications.append(
-                html.Div([
-                    html.Div([
-                        html.Span("📍", style={'fontSize': '20px', 'marginRight': '10px'}),
-                        html.Span(f"BUY NOW: {full_name}", style={'fontWeight': 'bold', 'color': '#10d9aa'})
-                    ]),
-                    html.Div(f"{closeness:.1f}% from target | Buy: ₹{buy_price:.2f} | Sell: ₹{sell_price:.2f}", style={'fontSize': '12px', 'color': '#9090c0'}),
-                    html.Div("💰 Target 30% gains, consider partial profit-taking at 20%", style={'fontSize': '11px', 'color': '#10d9aa', 'fontStyle': 'italic'}),
-                    html.Div(current_time.strftime('%H:%M:%S'), style={'fontSize': '10px', 'color': '#5858a0'})
-                ], style={
-                    'backgroundColor': 'rgba(16,217,170,0.05)',
-                    'border': '1px solid rgba(16,217,170,0.18)',
-                    'borderRadius': '5px',
-                    'padding': '10px',
-                    'margin': '5px 0',
-                    'borderLeft': '4px solid #10d9aa'
-                })
-            )
+            notifications.append(_v20_alert_card(
+                "📍", f"BUY NOW: {stock_resolver.get_display_name(stock.get('Symbol', 'Unknown'))}",
+                f"{stock.get('Closeness (%)', 0):.1f}% from target | Buy: ₹{buy_price:.2f} | Sell: ₹{sell_price:.2f}",
+                "💰 Target 30% gains, consider partial profit-taking at 20%",
+                time_str, accent='#10d9aa', tint='16,217,170', fill=0.05, edge=0.18,
+            ))
 
         # Check for WAIT (Bearish) signals - Important warnings!
-        bearish_signals = df[df.get('Signal Strength', '') == 'WAIT (Bearish)'] if 'Signal Strength' in df.columns else pd.DataFrame()
-
-        for _, stock in bearish_signals.head(2).iterrows():
-            symbol = stock.get('Symbol', 'Unknown')
-            closeness = stock.get('Closeness (%)', 0)
+        for stock in bearish_signals.to_dict('records'):
             buy_price = stock.get('Target Buy Price (Low)', 0)
-            full_name = stock_resolver.get_display_name(symbol)
-
-            notifications.append(
-                html.Div([
-                    html.Div([
-                        html.Span("⚠️", style={'fontSize': '20px', 'marginRight': '10px'}),
-                        html.Span(f"WAIT: {full_name}", style={'fontWeight': 'bold', 'color': '#e8a000'})
-                    ]),
-                    html.Div(f"{closeness:.1f}% from target | Buy trigger: ₹{buy_price:.2f} | Wait for better entry", style={'fontSize': '12px', 'color': '#9090c0'}),
-                    html.Div(current_time.strftime('%H:%M:%S'), style={'fontSize': '10px', 'color': '#5858a0'})
-                ], style={
-                    'backgroundColor': 'rgba(232,160,0,0.08)',
-                    'border': '1px solid rgba(232,160,0,0.25)',
-                    'borderRadius': '5px',
-                    'padding': '10px',
-                    'margin': '5px 0',
-                    'borderLeft': '4px solid #e8a000'
-                })
-            )
+            notifications.append(_v20_alert_card(
+                "⚠️", f"WAIT: {stock_resolver.get_display_name(stock.get('Symbol', 'Unknown'))}",
+                f"{stock.get('Closeness (%)', 0):.1f}% from target | Buy trigger: ₹{buy_price:.2f} | Wait for better entry",
+                None,
+                time_str, accent='#e8a000', tint='232,160,0', fill=0.08, edge=0.25,
+            ))
 
         if not notifications:
             notifications.append(
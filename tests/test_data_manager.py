@@ -0,0 +1,43 @@
+"""
+Unit tests for data_manager.py's V20 signal processing.
+
+No live network: the batched ``yf.download`` price fetch is replaced with a fixed frame.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_manager
+
+
+def test_process_v20_signals_computes_proximity_per_signal(monkeypatch):
+    dates = pd.date_range("2026-02-09", periods=2, freq="D")
+    prices = pd.concat(
+        {
+            "TCS.NS": pd.DataFrame({"Close": [100.0, 105.0]}, index=dates),
+            "INFY.NS": pd.DataFrame({"Close": [100.0, 90.0]}, index=dates),
+            "ITC.NS": pd.DataFrame({"Close": [100.0, 50.0]}, index=dates),
+        },
+        axis=1,
+    )
+    monkeypatch.setattr(data_manager.yf, "download", lambda **kwargs: prices)
+    signals = pd.DataFrame(
+        [
+            {"Symbol": "tcs", "Buy_Date": pd.Timestamp("2026-02-01"), "Buy_Price_Low": 100.0, "Sell_Price_High": 120.0, "Sequence_Gain_Percent": 20.0},
+            {"Symbol": "INFY", "Buy_Date": pd.NaT, "Buy_Price_Low": 100.0, "Sell_Price_High": None, "Sequence_Gain_Percent": 15.0},
+            {"Symbol": "ITC", "Buy_Date": pd.Timestamp("2026-02-01"), "Buy_Price_Low": 0.0, "Sell_Price_High": 60.0, "Sequence_Gain_Percent": 5.0},
+            {"Symbol": "NOPRICE", "Buy_Date": pd.Timestamp("2026-02-01"), "Buy_Price_Low": 10.0, "Sell_Price_High": 12.0, "Sequence_Gain_Percent": 5.0},
+        ]
+    )
+
+    result = data_manager.process_v20_signals(signals)
+
+    assert result["Symbol"].tolist() == ["TCS", "INFY"]
+    assert result["Signal Buy Date"].tolist() == ["2026-02-01", "N/A"]
+    assert result["Proximity to Buy (%)"].tolist() == [5.0, -10.0]
+    assert result["Closeness (%)"].tolist() == [5.0, 10.0]
+    assert result["Target Sell Price"].iloc[0] == 120.0
+    assert pd.isna(result["Target Sell Price"].iloc[1])
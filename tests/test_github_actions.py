@@ -1,3 +1,4 @@
+import io
 import pytest
 import pandas as pd
 import sys
@@ -9,7 +10,8 @@ from datetime import datetime
 # Add the modules directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
 
-from stock_screener import StockScreener
+import stock_screener
+from stock_screener import StockScreener, add_moving_averages_to_stocks, get_current_market_prices
 
 
 class TestStockScreenerUnit:
@@ -102,6 +104,37 @@ class TestStockScreenerUnit:
         result = screener.apply_screening_criteria(sample_stock_data)
         assert result is True
     
+    def test_screening_mask_matches_per_record_criteria(self, screener, sample_stock_data):
+        """The vectorized mask agrees with apply_screening_criteria record by record"""
+        records = [
+            sample_stock_data,
+            {**sample_stock_data, 'net_profit': 150},
+            {**sample_stock_data, 'last_3q_profits': []},
+            {**sample_stock_data, 'last_3q_profits': [100, 600]},
+            {**sample_stock_data, 'is_psu': True},
+            {**sample_stock_data, 'is_bank_finance': True, 'net_profit': 1500, 'roe': 12, 'roce': 0},
+            {**sample_stock_data, 'is_bank_finance': True, 'net_profit': 900, 'roe': 12},
+        ]
+
+        mask = screener.screening_mask(pd.DataFrame.from_records(records))
+
+        assert mask.tolist() == [screener.apply_screening_criteria(r) for r in records]
+        assert mask.tolist() == [True, False, False, False, False, True, False]
+
+    def test_blank_values_fail_screening(self, screener, sample_stock_data):
+        """A blank D/E or a blank quarter fails its rule instead of taking a default"""
+        records = [
+            {**sample_stock_data, 'debt_to_equity': float('nan')},
+            {**sample_stock_data, 'debt_to_equity': None},
+            {**sample_stock_data, 'last_3q_profits': [60, float('nan'), 70]},
+            {**sample_stock_data, 'last_3q_profits': [60, 70]},
+        ]
+
+        mask = screener.screening_mask(pd.DataFrame.from_records(records))
+
+        assert mask.tolist() == [screener.apply_screening_criteria(r) for r in records]
+        assert mask.tolist() == [False, False, False, True]
+
     def test_apply_screening_criteria_none_data(self, screener):
         """Test screening criteria with None data"""
         result = screener.apply_screening_criteria(None)
@@ -112,13 +145,49 @@ class TestStockScreenerUnit:
         result = screener.apply_screening_criteria({})
         assert result is False
 
+    def test_add_moving_averages_maps_batch_results_by_symbol(self):
+        """MAs from one batched download land on every row for that symbol, NaN symbols untouched"""
+        dates = pd.date_range('2024-01-01', periods=60, freq='D')
+        prices = pd.concat({
+            'AAA.NS': pd.DataFrame({'Close': range(1, 61)}, index=dates, dtype=float),
+            'BBB.NS': pd.DataFrame({'Close': [float('nan')] * 60}, index=dates),
+        }, axis=1)
+        df = pd.DataFrame({'Symbol': [None, 'aaa ', 'BBB', 'AAA'], 'Current_Price': [1.0, 2.0, 3.0, 4.0]})
+
+        with patch('yfinance.download', return_value=prices) as mock_download:
+            result = add_moving_averages_to_stocks(df)
+
+        assert mock_download.call_count == 1
+        assert result['Current_Price'].tolist() == [1.0, 60.0, 3.0, 60.0]
+        assert result['MA10'].tolist()[1::2] == [55.5, 55.5]
+        assert result['MA50'].tolist()[1::2] == [35.5, 35.5]
+        assert result[['MA10', 'MA50', 'MA100']].iloc[[0, 2]].isna().all().all()
+        assert result['MA100'].isna().all()
+
+    def test_get_current_market_prices_uses_one_download(self):
+        """Latest closes for many symbols come from a single batched download"""
+        dates = pd.date_range('2024-01-01', periods=2, freq='D')
+        prices = pd.concat({
+            'AAA.NS': pd.DataFrame({'Close': [10.0, 11.0]}, index=dates),
+            'BBB.NS': pd.DataFrame({'Close': [float('nan'), float('nan')]}, index=dates),
+        }, axis=1)
+
+        with patch('yfinance.download', return_value=prices) as mock_download:
+            result = get_current_market_prices(['AAA', 'BBB', 'AAA', 'CCC'])
+
+        assert mock_download.call_count == 1
+        assert mock_download.call_args.kwargs['tickers'] == ['AAA.NS', 'BBB.NS', 'CCC.NS']
+        assert result == {'AAA': 11.0}
+
 
 class TestStockScreenerIntegration:
     """Integration tests for StockScreener class"""
     
     @pytest.fixture
-    def screener(self):
-        return StockScreener()
+    def screener(self, tmp_path, monkeypatch):
+        # Checkpoint and report CSVs go to the test's tmp dir, never the repo's output/
+        monkeypatch.setattr(stock_screener, 'OUTPUT_DIR', str(tmp_path / 'output'))
+        return StockScreener(cache_dir=tmp_path)
     
     @patch('yfinance.Ticker')
     def test_get_financial_data_success(self, mock_ticker, screener):
@@ -153,6 +222,160 @@ class TestStockScreenerIntegration:
         assert result['sector'] == 'Technology'
         assert result['market_cap'] == 1000000000000
     
+    @patch.object(StockScreener, 'get_screener_data', return_value=None)
+    @patch('yfinance.Ticker')
+    def test_get_financial_data_quarterly_profits(self, mock_ticker, _mock_screener_data, screener):
+        """Latest four quarters are converted to crores, skipping gaps"""
+        mock_stock = Mock()
+        mock_stock.info = {'longName': 'Test Company Limited'}
+        mock_stock.financials = pd.DataFrame([[5e9, 4e9]], index=['Net Income'])
+        mock_stock.quarterly_financials = pd.DataFrame(
+            [[1e9, float('nan'), -8e8, 7e8, 6e8]], index=['Net Income']
+        )
+        mock_ticker.return_value = mock_stock
+
+        result = screener.get_financial_data('TEST')
+
+        assert result['net_profit'] == 500
+        assert result['latest_quarter_profit'] == 100
+        assert result['last_3q_profits'] == [80, 70]
+
+    @patch.object(StockScreener, 'get_screener_data', return_value=None)
+    @patch('yfinance.Ticker')
+    def test_record_without_screener_data_is_not_cached(self, mock_ticker, _mock_screener_data, screener):
+        """A Screener.in failure still yields a record, but one that is refetched next time"""
+        mock_stock = Mock()
+        mock_stock.info = {'longName': 'Test Company Limited', 'debtToEquity': 50}
+        mock_stock.financials = pd.DataFrame([[5e9]], index=['Net Income'])
+        mock_stock.quarterly_financials = pd.DataFrame([[1e9]], index=['Net Income'])
+        mock_ticker.return_value = mock_stock
+
+        result = screener.get_financial_data('TEST')
+
+        assert result['screener_data_missing'] is True
+        assert result['roce'] == 0.0
+        assert result['debt_to_equity'] == 0.5
+        assert screener.cache.get('TEST', 'fundamentals') is None
+
+    @patch('yfinance.Ticker')
+    def test_get_financial_data_served_from_cache(self, mock_ticker, screener):
+        """A fresh cache entry short-circuits yfinance; failures are never cached"""
+        screener.cache.set('CACHED', 'fundamentals', {'symbol': 'CACHED', 'net_profit': 500})
+
+        assert screener.get_financial_data('CACHED') == {'symbol': 'CACHED', 'net_profit': 500}
+        mock_ticker.assert_not_called()
+
+        mock_ticker.side_effect = Exception("Network error")
+        with patch('time.sleep', return_value=None):
+            assert screener.get_financial_data('MISSING', max_retries=0) is None
+        assert screener.cache.get('MISSING', 'fundamentals') is None
+
+        screener.cache.ttl_seconds = 0
+        assert screener.cache.get('CACHED', 'fundamentals') is None
+
+    def test_concurrent_fetches_for_one_symbol_are_coalesced(self, screener):
+        """Callers racing on the same uncached symbol share a single upstream fetch"""
+        import threading
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_fetch(symbol, max_retries=3):
+            started.set()
+            release.wait(5)
+            return {'symbol': symbol}
+
+        with patch.object(screener, '_fetch_financial_data', side_effect=slow_fetch) as mock_fetch:
+            results = []
+            first = threading.Thread(target=lambda: results.append(screener.get_financial_data('SAME')))
+            first.start()
+            started.wait(5)
+            second = threading.Thread(target=lambda: results.append(screener.get_financial_data('SAME')))
+            second.start()
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        assert mock_fetch.call_count == 1
+        assert results == [{'symbol': 'SAME'}, {'symbol': 'SAME'}]
+
+    def test_coalesced_fetch_without_screener_data_is_not_cached(self, screener):
+        """Callers sharing a fetch whose Screener.in enrichment failed leave nothing cached"""
+        import threading
+        release = threading.Event()
+        started = threading.Event()
+        partial = {'symbol': 'SAME', 'roce': 0.0, 'screener_data_missing': True}
+
+        def slow_fetch(symbol, max_retries=3):
+            started.set()
+            release.wait(5)
+            return partial
+
+        with patch.object(screener, '_fetch_financial_data', side_effect=slow_fetch) as mock_fetch:
+            results = []
+            first = threading.Thread(target=lambda: results.append(screener.get_financial_data('SAME')))
+            first.start()
+            started.wait(5)
+            second = threading.Thread(target=lambda: results.append(screener.get_financial_data('SAME')))
+            second.start()
+            release.set()
+            first.join(5)
+            second.join(5)
+
+            assert results == [partial, partial]
+            assert screener.cache.get('SAME', 'fundamentals') is None
+
+            fetches = mock_fetch.call_count
+            screener.get_financial_data('SAME')
+            assert mock_fetch.call_count == fetches + 1
+
+    def test_get_screener_data_honors_retry_after(self, screener):
+        """A 429 from Screener.in pauses for Retry-After and then retries the page"""
+        throttled = Mock(status_code=429, headers={'Retry-After': '2'})
+        ok = Mock(status_code=200, headers={}, content=b"<html></html>")
+        clock = [time.monotonic()]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        with patch.object(screener.session, 'get', side_effect=[throttled, ok]) as mock_get, \
+                patch('time.sleep', side_effect=fake_sleep), \
+                patch('time.monotonic', side_effect=lambda: clock[0]):
+            result = screener.get_screener_data('TEST')
+
+        assert mock_get.call_count == 2
+        assert result == {'roce': 0.0, 'roe': 0.0, 'public_holding': 0.0, 'debt_to_equity': 0.0}
+        assert sum(sleeps) == pytest.approx(2.0)
+
+    def test_get_screener_data_parses_company_page(self, screener):
+        """Key ratios, latest public holding and balance-sheet D/E are read from one page"""
+        page = b"""<html><body>
+            <ul id="top-ratios">
+              <li><span class="name">Market Cap</span><span class="number">1,234 Cr.</span></li>
+              <li><span class="name">ROCE</span><span class="number">24.5 %</span></li>
+              <li><span class="name">ROE</span><span class="number">18.2 %</span></li>
+            </ul>
+            <section id="balance-sheet"><table>
+              <tr><th></th><th>Mar 2023</th><th>Mar 2024</th></tr>
+              <tr><td>Equity Capital</td><td>50</td><td>50</td></tr>
+              <tr><td>Share Capital</td><td>50</td><td>50</td></tr>
+              <tr><td>Reserves</td><td>400</td><td>450</td></tr>
+              <tr><td>Borrowings +</td><td>120</td><td>100</td></tr>
+            </table></section>
+            <section id="shareholding"><table>
+              <tr><th></th><th>Dec 2023</th><th>Mar 2024</th></tr>
+              <tr><td>Promoters +</td><td>60.00%</td><td>60.50%</td></tr>
+              <tr><td>Public +</td><td>22.10%</td><td>21.75%</td></tr>
+            </table></section>
+        </body></html>"""
+        ok = Mock(status_code=200, headers={}, content=page)
+
+        with patch.object(screener.session, 'get', return_value=ok):
+            result = screener.get_screener_data('TEST')
+
+        assert result == {'roce': 24.5, 'roe': 18.2, 'public_holding': 21.75, 'debt_to_equity': 0.2}
+
     @patch('yfinance.Ticker')
     def test_get_financial_data_failure(self, mock_ticker, screener):
         """Test financial data retrieval failure"""
@@ -165,18 +388,36 @@ class TestStockScreenerIntegration:
     def test_get_nse_stock_list_success(self, mock_get, screener):
         """Test successful NSE stock list retrieval"""
         mock_response = Mock()
-        mock_response.text = "SYMBOL\nRELIANCE\nTCS\nINFY\n"
+        mock_response.raw = io.BytesIO(b"SYMBOL,NAME OF COMPANY\nRELIANCE,Reliance\nTCS ,TCS\nINFY,Infosys\nTCS,TCS\n")
         mock_response.raise_for_status.return_value = None
         mock_response.status_code = 200
+        mock_response.headers = {'ETag': '"v1"'}
         mock_get.return_value = mock_response
         
         result = screener.get_nse_stock_list()
         
+        assert result == ['INFY', 'RELIANCE', 'TCS']
+        assert mock_get.call_args.kwargs['stream'] is True
+        mock_response.close.assert_called_once()
         assert len(result) == 3
         assert 'RELIANCE' in result
         assert 'TCS' in result
         assert 'INFY' in result
     
+    @patch('requests.get')
+    def test_get_nse_stock_list_uses_cache_and_revalidates(self, mock_get, screener):
+        """A fresh cached list skips NSE; a stale one is revalidated with its ETag"""
+        screener.cache.set('_nse', 'equity_l', {'symbols': ['INFY', 'TCS'], 'etag': '"v1"', 'last_modified': None})
+
+        assert screener.get_nse_stock_list() == ['INFY', 'TCS']
+        mock_get.assert_not_called()
+
+        mock_get.return_value = Mock(status_code=304, headers={})
+        with patch('time.time', return_value=time.time() + 2 * 24 * 3600):
+            assert screener.get_nse_stock_list() == ['INFY', 'TCS']
+        assert mock_get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+        mock_get.return_value.close.assert_called_once()
+
     @patch('requests.get')
     def test_get_nse_stock_list_failure(self, mock_get, screener):
         """Failure should fall back to the built-in symbol universe."""
@@ -250,13 +491,86 @@ class TestStockScreenerIntegration:
         assert len(result) == 1
         assert result.iloc[0]['Symbol'] == 'TEST1'
 
+    @patch.object(StockScreener, 'check_existing_comprehensive_data')
+    @patch.object(StockScreener, 'get_nse_stock_list')
+    @patch.object(StockScreener, 'get_financial_data')
+    def test_screen_stocks_survives_failing_fetch(self, mock_get_financial, mock_get_nse, mock_check_existing, screener):
+        """A symbol whose fetch raises inside the worker pool is skipped, not fatal"""
+        mock_get_nse.return_value = ['GOOD', 'BAD']
+        mock_check_existing.return_value = None
+
+        def fetch(symbol):
+            if symbol == 'BAD':
+                raise RuntimeError("boom")
+            return {
+                'symbol': symbol, 'company_name': 'Good Co', 'sector': 'Technology',
+                'industry': 'Software', 'market_cap': 1000, 'net_profit': 300, 'roce': 25,
+                'roe': 15, 'debt_to_equity': 0.2, 'latest_quarter_profit': 80,
+                'last_3q_profits': [60, 70, 75], 'public_holding': 20,
+                'is_bank_finance': False, 'is_psu': False,
+            }
+
+        mock_get_financial.side_effect = fetch
+
+        result = screener.screen_stocks()
+
+        assert result['Symbol'].tolist() == ['GOOD']
+        assert sorted(c.args[0] for c in mock_get_financial.call_args_list) == ['BAD', 'GOOD']
+        assert any(name.startswith('screened_stocks_') for name in os.listdir(stock_screener.OUTPUT_DIR))
+
+    @patch.object(StockScreener, 'check_existing_comprehensive_data', return_value=None)
+    @patch.object(StockScreener, 'get_nse_stock_list', return_value=['A', 'B', 'C', 'D', 'E'])
+    @patch.object(StockScreener, 'get_financial_data')
+    def test_checkpoints_append_to_one_file(self, mock_get_financial, _mock_get_nse, _mock_check_existing, screener):
+        """Periodic checkpoints append new rows to a single per-run file"""
+        mock_get_financial.side_effect = lambda symbol: {
+            'symbol': symbol, 'company_name': f'{symbol} Co', 'sector': 'Technology',
+            'industry': 'Software', 'market_cap': 1000, 'net_profit': 300, 'roce': 25,
+            'roe': 15, 'debt_to_equity': 0.2, 'latest_quarter_profit': 80,
+            'last_3q_profits': [60, 70, 75], 'public_holding': 20,
+            'is_bank_finance': False, 'is_psu': False,
+        }
+
+        screener.screen_stocks(checkpoint_interval=2)
+
+        assert os.path.dirname(screener._checkpoint_path) == stock_screener.OUTPUT_DIR
+        checkpoint = pd.read_csv(screener._checkpoint_path)
+        assert sorted(checkpoint['Symbol']) == ['A', 'B', 'C', 'D']
+        assert list(checkpoint.columns) == list(screener._results_frame([]).columns)
+
+    @patch.object(StockScreener, 'check_existing_comprehensive_data')
+    @patch.object(StockScreener, 'get_nse_stock_list')
+    def test_screen_stocks_rescreens_existing_csv(self, mock_get_nse, mock_check_existing, screener, tmp_path):
+        """A recent comprehensive CSV is re-screened from disk without fetching anything"""
+        base = {
+            'company_name': 'Co', 'sector': 'Technology', 'industry': 'Software',
+            'market_cap': 1000, 'net_profit': 300, 'roce': 25, 'roe': 15,
+            'debt_to_equity': 0.2, 'latest_quarter_profit': 80, 'public_holding': 20,
+            'is_bank_finance': False, 'is_psu': False,
+        }
+        records = [
+            {**base, 'symbol': 'PASS', 'last_3q_profits': [60, 70, 75]},
+            {**base, 'symbol': 'PEAK', 'last_3q_profits': [60, 70, 400]},
+            {**base, 'symbol': 'NONE', 'last_3q_profits': []},
+        ]
+        csv_path = tmp_path / 'comprehensive_stock_analysis_test.csv'
+        screener._results_frame(records).to_csv(csv_path, index=False)
+        mock_check_existing.return_value = str(csv_path)
+
+        result = screener.screen_stocks()
+
+        mock_get_nse.assert_not_called()
+        assert result['Symbol'].tolist() == ['PASS']
+        assert result['Net Profit (Cr)'].dtype == 'float64'
+
 
 class TestStockScreenerPerformance:
     """Performance tests for StockScreener class"""
     
     @pytest.fixture
-    def screener(self):
-        return StockScreener()
+    def screener(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(stock_screener, 'OUTPUT_DIR', str(tmp_path / 'output'))
+        return StockScreener(cache_dir=tmp_path)
     
     def test_screening_criteria_performance(self, screener):
         """Test performance of screening criteria application"""
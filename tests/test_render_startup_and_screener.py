@@ -272,23 +272,3 @@ def test_v20_indicator_calculation_uses_completed_daily_candles_only(monkeypatch
     assert pd.isna(macd_val_1)
     assert pd.isna(rsi_val_2)
     assert pd.isna(macd_val_2)
-
-
-def test_v20_indicator_dataframe_is_deterministic_for_same_history(monkeypatch):
-    indicator_calc = v20_callbacks.AdvancedIndicatorCalculator(cache_enabled=False)
-    dates = pd.date_range("2025-10-01", periods=80, freq="B")
-    close_prices = pd.Series(range(100, 180), index=dates, dtype=float)
-    history = pd.DataFrame({"Close": close_prices}, index=dates)
-
-    class DummyTicker:
-        def history(self, period="6mo", interval="1d", auto_adjust=False):
-            return history.copy()
-
-    monkeypatch.setattr(v20_callbacks.yf, "Ticker", lambda ticker: DummyTicker())
-
-    df = pd.DataFrame([{"Symbol": "TCS", "Closeness (%)": 1.5}])
-    result_1 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
-    result_2 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
-
-    assert result_1["RSI"].iloc[0] == result_2["RSI"].iloc[0]
-    assert result_1["MACD Signal"].iloc[0] == result_2["MACD Signal"].iloc[0]
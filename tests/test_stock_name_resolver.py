@@ -0,0 +1,138 @@
+"""
+Unit tests for modules/stock_name_resolver.py -- the symbol -> company-name lookup used by
+the V20 notification cards.
+
+No live network: ``yf.Ticker`` is replaced with a fake whose ``.info`` is a plain dict, and
+the module's persistent cache is swapped for an empty dict per test.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import stock_name_resolver as snr
+
+_real_search_name = snr._search_name
+
+
+class _FakeTicker:
+    calls = []
+    names = {}
+
+    def __init__(self, ticker):
+        _FakeTicker.calls.append(ticker)
+        self.info = {"longName": _FakeTicker.names.get(ticker)}
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch, tmp_path):
+    _FakeTicker.calls = []
+    _FakeTicker.names = {}
+    monkeypatch.setattr(snr, "_PERSIST", {})
+    monkeypatch.setattr(snr, "_dirty", False)
+    monkeypatch.setattr(snr, "NAME_CACHE_PATH", str(tmp_path / "names.pkl"))
+    monkeypatch.setattr(snr.yf, "Ticker", _FakeTicker)
+    monkeypatch.setattr(snr, "_search_name", lambda symbol: None)
+
+
+def test_resolves_nse_name_and_memoizes():
+    _FakeTicker.names = {"TCS.NS": "Tata Consultancy Services Limited"}
+
+    assert snr.stock_resolver.get_stock_name("TCS") == "Tata Consultancy Services Limited"
+    assert snr.stock_resolver.get_stock_name("TCS") == "Tata Consultancy Services Limited"
+    assert _FakeTicker.calls == ["TCS.NS"]
+
+
+def test_persistent_cache_skips_network():
+    snr._remember("INFY", "Infosys Limited")
+
+    assert snr.stock_resolver.get_stock_name("INFY") == "Infosys Limited"
+    assert _FakeTicker.calls == []
+
+
+def test_unresolved_symbol_is_negatively_cached(monkeypatch):
+    assert snr.stock_resolver.get_stock_name("ZZZZ") == "ZZZZ"
+    assert snr.stock_resolver.get_stock_name("ZZZZ") == "ZZZZ"
+    assert _FakeTicker.calls == ["ZZZZ.NS", "ZZZZ.BO"]
+
+    name, expires_at = snr._PERSIST["ZZZZ"]
+    monkeypatch.setattr(snr.time, "time", lambda: expires_at + 1)
+    snr.stock_resolver.get_stock_name("ZZZZ")
+    assert _FakeTicker.calls == ["ZZZZ.NS", "ZZZZ.BO", "ZZZZ.NS", "ZZZZ.BO"]
+
+
+def test_name_cache_round_trips_through_disk(monkeypatch):
+    _FakeTicker.names = {"ITC.BO": "ITC Limited"}
+    snr.stock_resolver.get_stock_name("ITC")
+    monkeypatch.setattr(snr, "_dirty", True)
+    snr._save_name_cache()
+
+    import pickle
+    with open(snr.NAME_CACHE_PATH, "rb") as fh:
+        assert pickle.load(fh)["ITC"][0] == "ITC Limited"
+
+
+def test_display_name_truncates():
+    _FakeTicker.names = {"HDFCBANK.NS": "HDFC Bank Limited Long Registered Name"}
+
+    display = snr.stock_resolver.get_display_name("HDFCBANK", max_length=12)
+    assert display == "HDFC Bank..."
+
+
+def test_prefetch_names_populates_cache_in_one_batch(monkeypatch):
+    created = []
+
+    class _FakeTickers:
+        def __init__(self, joined):
+            created.append(joined)
+            self.tickers = {t: _FakeTicker(t) for t in joined.split()}
+
+    _FakeTicker.names = {"TCS.NS": "Tata Consultancy Services Limited", "INFY.NS": "Infosys Limited"}
+    monkeypatch.setattr(snr.yf, "Tickers", _FakeTickers)
+
+    snr.stock_resolver.prefetch_names(["tcs", "INFY", "TCS", "UNKNOWN"])
+
+    assert created == ["TCS.NS INFY.NS UNKNOWN.NS"]
+    assert {k: v[0] for k, v in snr._PERSIST.items()} == {
+        "TCS": "Tata Consultancy Services Limited", "INFY": "Infosys Limited", "UNKNOWN": None,
+    }
+    _FakeTicker.calls = []
+    assert snr.stock_resolver.get_stock_name("INFY") == "Infosys Limited"
+    assert snr.stock_resolver.get_stock_name("UNKNOWN") == "UNKNOWN"
+    assert snr.stock_resolver.get_stock_name(" tcs ") == "Tata Consultancy Services Limited"
+    assert _FakeTicker.calls == []
+    assert len(snr._PERSIST) == 3
+
+
+def test_prefetch_names_falls_back_to_bse(monkeypatch):
+    class _FakeTickers:
+        def __init__(self, joined):
+            self.tickers = {t: _FakeTicker(t) for t in joined.split()}
+
+    _FakeTicker.names = {"ITC.BO": "ITC Limited"}
+    monkeypatch.setattr(snr.yf, "Tickers", _FakeTickers)
+
+    snr.stock_resolver.prefetch_names(["ITC"])
+
+    assert snr._PERSIST["ITC"][0] == "ITC Limited"
+    assert _FakeTicker.calls == ["ITC.NS", "ITC.BO"]
+
+
+def test_search_endpoint_is_preferred_over_yfinance(monkeypatch):
+    class _Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"quotes": [
+                {"symbol": "RELIANCE.L", "longname": "Reliance (London)"},
+                {"symbol": "RELIANCE.NS", "longname": "Reliance Industries Limited"},
+            ]}
+
+    monkeypatch.setattr(snr, "_search_name", _real_search_name)
+    monkeypatch.setattr(snr._SESSION, "get", lambda *args, **kwargs: _Response())
+
+    assert snr.stock_resolver.get_stock_name("RELIANCE") == "Reliance Industries Limited"
+    assert _FakeTicker.calls == []
@@ -0,0 +1,87 @@
+"""
+Unit tests for the V20 table's technical indicator columns in modules/v20_callbacks.py.
+
+No live network: the batched ``yf.download`` history fetch is replaced with a fixed frame,
+and the per-day indicator cache starts empty in every test.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import v20_callbacks
+
+
+def test_v20_indicator_dataframe_is_deterministic_for_same_history(monkeypatch):
+    indicator_calc = v20_callbacks.AdvancedIndicatorCalculator(cache_enabled=False)
+    dates = pd.date_range("2025-10-01", periods=80, freq="B")
+    close_prices = pd.Series(range(100, 180), index=dates, dtype=float)
+    history = pd.concat({"TCS.NS": pd.DataFrame({"Close": close_prices}, index=dates)}, axis=1)
+
+    monkeypatch.setattr(v20_callbacks.yf, "download", lambda **kwargs: history.copy())
+    monkeypatch.setattr(v20_callbacks, "_EOD_INDICATOR_CACHE", {})
+
+    df = pd.DataFrame([{"Symbol": "TCS", "Closeness (%)": 1.5}])
+    result_1 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+    result_2 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+
+    assert result_1["RSI"].iloc[0] == result_2["RSI"].iloc[0]
+    assert result_1["MACD Signal"].iloc[0] == result_2["MACD Signal"].iloc[0]
+    assert not pd.isna(result_1["RSI"].iloc[0])
+
+
+def test_v20_indicators_reuse_cached_values_for_same_trading_day(monkeypatch):
+    indicator_calc = v20_callbacks.AdvancedIndicatorCalculator(cache_enabled=False)
+    dates = pd.date_range("2025-10-01", periods=80, freq="B")
+    history = pd.concat({"TCS.NS": pd.DataFrame({"Close": range(100, 180)}, index=dates, dtype=float)}, axis=1)
+    downloads = []
+
+    def fake_download(**kwargs):
+        downloads.append(kwargs["tickers"])
+        return history.copy()
+
+    monkeypatch.setattr(v20_callbacks.yf, "download", fake_download)
+    monkeypatch.setattr(v20_callbacks, "_EOD_INDICATOR_CACHE", {})
+
+    df = pd.DataFrame([{"Symbol": "TCS", "Closeness (%)": 1.5}])
+    result_1 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+    result_2 = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+
+    assert downloads == [["TCS.NS"]]
+    assert result_1["RSI"].iloc[0] == result_2["RSI"].iloc[0]
+    assert result_1["Signal Strength"].iloc[0] == result_2["Signal Strength"].iloc[0]
+
+    v20_callbacks._EOD_INDICATOR_CACHE.clear()
+    v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+
+    assert len(downloads) == 2
+
+
+def test_v20_indicators_symbol_missing_from_batch_is_not_cached(monkeypatch):
+    indicator_calc = v20_callbacks.AdvancedIndicatorCalculator(cache_enabled=False)
+    dates = pd.date_range("2025-10-01", periods=80, freq="B")
+    history = pd.concat({"TCS.NS": pd.DataFrame({"Close": range(100, 180)}, index=dates, dtype=float)}, axis=1)
+    downloads = []
+
+    def fake_download(**kwargs):
+        downloads.append(kwargs["tickers"])
+        return history.copy()
+
+    monkeypatch.setattr(v20_callbacks.yf, "download", fake_download)
+    monkeypatch.setattr(v20_callbacks, "_EOD_INDICATOR_CACHE", {})
+
+    df = pd.DataFrame([
+        {"Symbol": "TCS", "Closeness (%)": 1.5},
+        {"Symbol": "INFY", "Closeness (%)": 1.0},
+    ])
+    result = v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+
+    assert result["Signal Strength"].iloc[1] == "N/A"
+    assert pd.isna(result["RSI"].iloc[1])
+    assert list(v20_callbacks._EOD_INDICATOR_CACHE) == ["TCS"]
+
+    v20_callbacks.add_technical_indicators_to_df(df, indicator_calc)
+
+    assert downloads == [["TCS.NS", "INFY.NS"], ["INFY.NS"]]
@@ -0,0 +1,62 @@
+"""
+Unit tests for the per-table helpers in modules/v20_callbacks.py that derive display columns
+(sell trigger, signal strength, table columns) from the processed V20 frame.
+
+Pure DataFrame-in / DataFrame-out: nothing here touches yfinance or a running Dash app.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import v20_callbacks
+
+
+def test_sell_trigger_thresholds():
+    df = pd.DataFrame({
+        "Symbol": ["A", "B", "C", "D", "E", "F"],
+        "Latest Close Price": [110.0, 99.0, 96.0, 80.0, np.nan, 50.0],
+        "Target Sell Price": [100.0, 100.0, 100.0, 100.0, 100.0, 0.0],
+    })
+
+    result = v20_callbacks.add_sell_trigger_to_df(df)
+
+    assert result["Sell Trigger"].tolist() == [
+        "SELL NOW", "SELL SOON", "APPROACHING", "HOLD", "N/A", "N/A",
+    ]
+    assert "Sell Trigger" not in df.columns
+
+
+def test_sell_trigger_without_target_column():
+    df = pd.DataFrame({"Symbol": ["A"], "Latest Close Price": [10.0]})
+
+    assert v20_callbacks.add_sell_trigger_to_df(df)["Sell Trigger"].tolist() == ["N/A"]
+
+
+def test_table_column_specs_hide_internal_columns_and_type_numerics():
+    columns = ("Symbol", "Current Price", "Closeness (%)", "RSI", "Signal Strength")
+
+    specs = v20_callbacks._table_column_specs(columns)
+
+    assert specs == [
+        {"name": "Symbol", "id": "Symbol", "type": "text"},
+        {"name": "Current Price", "id": "Current Price", "type": "numeric"},
+        {"name": "Signal Strength", "id": "Signal Strength", "type": "text"},
+    ]
+    assert v20_callbacks._table_column_specs(columns) is specs
+
+
+def test_signal_strengths_apply_rules_in_priority_order():
+    nan = np.nan
+    closeness = [1.0, 1.0, 4.0, 1.5, 8.0, 8.0, nan]
+    rsi = [25.0, 55.0, 55.0, 55.0, 75.0, 50.0, 20.0]
+    macd = [0.5, 0.5, 0.5, -0.1, 0.5, nan, 0.5]
+
+    result = v20_callbacks._signal_strengths(closeness, rsi, macd)
+
+    assert result.tolist() == [
+        "STRONG BUY", "BUY NOW", "BUY", "WAIT (Bearish)", "OVERBOUGHT", "WATCH", "WATCH",
+    ]